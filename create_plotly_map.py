@@ -17,35 +17,146 @@ Plotlyを使用して9ビュー切替のインタラクティブHTMLマップを
 成長軌跡の矢印: annotation ではなく line trace + triangle marker で描画
 """
 
+import base64
+import gzip
 import json
-import math
+import numpy as np
 import yaml
-import plotly.graph_objects as go
+import plotly.io as pio
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
 from pathlib import Path
 
+# LibYAML が利用可能なら C 実装のローダーでパースする
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# orjson が利用可能なら Plotly の図のJSONシリアライズに使う
+try:
+    import orjson
+except ImportError:
+    orjson = None
+if orjson is not None:
+    pio.json.config.default_engine = "orjson"
+
 # --- データ読み込み ---
 DATA_PATH = Path(__file__).parent / "data" / "studios_merged.yaml"
 OUTPUT_PATH = Path(__file__).parent / "positioning_map.html"
 
-with open(DATA_PATH, "r", encoding="utf-8") as f:
-    data = yaml.safe_load(f)
 
-studios = data["studios"]
 
-# --- スタジオのグローバルインデックスマップ（id → index）---
-studio_global_idx = {id(s): i for i, s in enumerate(studios)}
+@dataclass(frozen=True, slots=True)
+class Studio:
+    """スタジオ1社分のデータ（YAML に記載のないフィールドは None）"""
+    name: str
+    region: str
+    name_en: str = ""
+    founded: int | None = None
+    size_founded_num: int | None = None
+    size_current_num: int | None = None
+    original_score: float | None = None
+    original_score_founded: float | None = None
+    ip_ownership_score: float | None = None
+    business_model: str | None = None
+    ai_adoption_level: str | None = None
+    ai_adoption_detail: str | None = None
+    revenue_billion_yen: float | None = None
+    revenue_year: int | None = None
+    operating_margin: float | None = None
+    licensing_ratio: float | None = None
+    primary_platform: list | None = None
+    ownership_type: str | None = None
+    parent_company: str | None = None
+    notable_works: list | None = None
+    years_to_profitability: int | None = None
+    # グローバルインデックス（studios 内の位置）
+    _gi: int | None = None
+    # ホバー用の代表作文字列（先頭3作をカンマ区切り）
+    _works_str: str = ""
+
+
+_STUDIO_KEYS = {f.name for f in fields(Studio)} - {"_gi", "_works_str"}
 
-# --- データ分類 ---
-domestic = [s for s in studios if s["region"] == "domestic"]
-international = [s for s in studios if s["region"] == "international"]
-
-# 成長軌跡マップ用: 設立時と現在のデータが両方あるスタジオ
-growth_studios = [
-    s for s in studios
-    if s.get("size_founded_num") and s.get("size_current_num")
-    and s["size_founded_num"] != s["size_current_num"]
+with open(DATA_PATH, "r", encoding="utf-8") as f:
+    data = yaml.load(f, Loader=_YamlLoader)
+
+# 描画に使うフィールドのみ取り込み、グローバルインデックスと代表作文字列を付与
+studios = [
+    Studio(
+        **{k: v for k, v in raw.items() if k in _STUDIO_KEYS},
+        _gi=i,
+        _works_str=", ".join((raw.get("notable_works") or [])[:3]),
+    )
+    for i, raw in enumerate(data["studios"])
 ]
 
+# --- 数値カラムストア（グローバルインデックス順、欠損は NaN）---
+NUMERIC_FIELDS = (
+    "original_score", "original_score_founded", "size_current_num", "size_founded_num",
+    "ip_ownership_score", "operating_margin", "revenue_billion_yen", "founded", "licensing_ratio",
+)
+COLS = {
+    f: np.array([np.nan if (v := getattr(s, f)) is None else v for s in studios], dtype=np.float64)
+    for f in NUMERIC_FIELDS
+}
+
+# --- データ分類 ---
+def get_primary_platform(s):
+    """スタジオの主要プラットフォーム（最上位）を返す"""
+    pf = s.primary_platform
+    if not pf:
+        return "Other"
+    return pf[0]
+
+
+@dataclass
+class StudioBuckets:
+    """ビューごとに使うスタジオの分類結果"""
+    domestic: list = field(default_factory=list)
+    international: list = field(default_factory=list)
+    # 成長軌跡マップ用: 設立時と現在のデータが両方あるスタジオ（region別）
+    growth_dom: list = field(default_factory=list)
+    growth_intl: list = field(default_factory=list)
+    # ビジネスモデル分析用: 現在人数があるスタジオ
+    bm: list = field(default_factory=list)
+    # 収益・規模マップ用: 売上データがあるスタジオ
+    revenue: list = field(default_factory=list)
+    # 黒字化データあり / なし
+    prof: list = field(default_factory=list)
+    nonprof: list = field(default_factory=list)
+    # 主要プラットフォーム → スタジオ列
+    by_pf: dict = field(default_factory=dict)
+
+
+def classify_studios(studio_list):
+    """全スタジオを一度だけ走査し、各ビュー用のバケットに振り分ける"""
+    b = StudioBuckets()
+    for s in studio_list:
+        is_dom = s.region == "domestic"
+        (b.domestic if is_dom else b.international).append(s)
+
+        size_founded = s.size_founded_num
+        size_current = s.size_current_num
+        if size_founded and size_current and size_founded != size_current:
+            (b.growth_dom if is_dom else b.growth_intl).append(s)
+        if size_current is not None:
+            b.bm.append(s)
+
+        if s.revenue_billion_yen is not None:
+            b.revenue.append(s)
+        if s.years_to_profitability is not None:
+            b.prof.append(s)
+        else:
+            b.nonprof.append(s)
+
+        b.by_pf.setdefault(get_primary_platform(s), []).append(s)
+    return b
+
+
+buckets = classify_studios(studios)
+
 # --- 色定義 ---
 COLOR_DOMESTIC = "#3498DB"
 COLOR_INTERNATIONAL = "#E74C3C"
@@ -115,18 +226,46 @@ CHART_HEIGHT = 750
 MARKER_SIZE = 10  # 全ビュー共通の固定マーカーサイズ
 MARKER_SIZE_SMALL = 7  # 成長軌跡の始点（設立時）用
 
+# --- 描画方式 ---
+# これを超える点数のマーカートレースは WebGL (Scattergl) で描画
+# 注意: Scattergl のトレースは近接ポイント同時ホバー（JS の buildPixelCache）の対象外になる
+# （plotly.js 4.1.1 の Fx.hover は Scattergl の pointNumber 指定に対応していないため）
+WEBGL_POINT_THRESHOLD = 30
+# 統合ポイントのラベル区切り（SVG は改行。WebGL のテキスト描画は <br> を解釈しないため1行に連結する）
+LABEL_JOINERS = {"scatter": "<br>", "scattergl": " / "}
+
+# --- ホバー ---
+HOVER_SEPARATOR = "<br>───────────<br>"  # 統合ポイントのホバー区切り線
+
+
+# 軸フィールドが欠損しているときの座標（x は未記載なら original_score、y は 10）
+X_DEFAULTS = {"operating_margin": 0, "founded": 2000}
+Y_DEFAULTS = {"revenue_billion_yen": 1}
+
+
+def studio_x(s, x_key="original_score"):
+    """x 座標（欠損時は X_DEFAULTS、なければ original_score）"""
+    x = getattr(s, x_key)
+    if x is None:
+        return X_DEFAULTS.get(x_key, s.original_score)
+    return x
+
+
+def studio_y(s, size_key="size_current_num"):
+    """y 座標（欠損・0 は Y_DEFAULTS、なければ 10）"""
+    return getattr(s, size_key) or Y_DEFAULTS.get(size_key, 10)
+
 
 # --- ラベル衝突回避 ---
+LABEL_COLLISION_DX = 0.10  # この範囲内（x方向）のラベルを衝突とみなす
+LABEL_COLLISION_DY = 150   # 同（y方向）
+
+
 def resolve_label_positions(studio_list, size_key="size_current_num", x_key="original_score"):
     """ラベルが近いスタジオ同士のtextpositionをずらして衝突回避（多段）"""
     positions = []
     for i, s in enumerate(studio_list):
-        x = s.get(x_key, s["original_score"])
-        if x is None:
-            x = 0
-        y_val = s.get(size_key, 10) or 10
-        y = y_val
-        positions.append((x, y, i))
+        positions.append((studio_x(s, x_key), studio_y(s, size_key), i))
 
     text_positions = ["middle right"] * len(studio_list)
     alternatives = [
@@ -134,196 +273,286 @@ def resolve_label_positions(studio_list, size_key="size_current_num", x_key="ori
         "top left", "middle left", "bottom center", "bottom left",
     ]
 
-    # 全ペアを距離順にソートして近い順から処理
+    # x順に走査し、閾値内に収まる近接ペアのみを距離順にソートして近い順から処理
+    order = sorted(range(len(positions)), key=lambda k: positions[k][0])
     pairs = []
-    for i in range(len(positions)):
-        for j in range(i + 1, len(positions)):
-            dx = abs(positions[i][0] - positions[j][0])
-            dy = abs(positions[i][1] - positions[j][1])
-            pairs.append((dx + dy * 0.5, i, j, dx, dy))
+    for a, i in enumerate(order):
+        xi, yi, _ = positions[i]
+        for b in range(a + 1, len(order)):
+            j = order[b]
+            dx = positions[j][0] - xi
+            if dx >= LABEL_COLLISION_DX:
+                break
+            dy = abs(positions[j][1] - yi)
+            if dy < LABEL_COLLISION_DY:
+                lo, hi = (i, j) if i < j else (j, i)
+                pairs.append((dx + dy * 0.5, lo, hi))
     pairs.sort()
 
     used = set()
-    for _, i, j, dx, dy in pairs:
-        if dx < 0.10 and dy < 150:
-            # j番目のラベルを、i番目およびすでに使われた位置と被らないようずらす
-            for alt in alternatives:
-                if alt != text_positions[i] and (j, alt) not in used:
-                    text_positions[j] = alt
-                    used.add((j, alt))
-                    break
+    for _, i, j in pairs:
+        # j番目のラベルを、i番目およびすでに使われた位置と被らないようずらす
+        for alt in alternatives:
+            if alt != text_positions[i] and (j, alt) not in used:
+                text_positions[j] = alt
+                used.add((j, alt))
+                break
     return text_positions
 
 
+def scatter_type(n_points):
+    """点数に応じてマーカートレースの type（SVG / WebGL）を選ぶ"""
+    return "scattergl" if n_points > WEBGL_POINT_THRESHOLD else "scatter"
+
+
+def log_marker_sizes(vals, base=6, scale=8, max_size=30, default=8):
+    """値配列から対数スケールのマーカーサイズ配列を一括計算（0以下・欠損は default）"""
+    sizes = np.clip(base + scale * np.log10(np.where(vals > 0, vals, 1.0)), base, max_size)
+    sizes[vals <= 0] = default
+    return sizes
+
+
+def coord_arrays(idx, x_key, y_key):
+    """グローバルインデックス列の x, y をカラムストアから NumPy 配列で取り出す（欠損の扱いは studio_x / studio_y と同じ）"""
+    xs = COLS[x_key][idx]
+    xs = np.where(np.isnan(xs), X_DEFAULTS.get(x_key, COLS["original_score"][idx]), xs)
+    ys = np.nan_to_num(COLS[y_key][idx], nan=0)
+    ys[ys == 0] = Y_DEFAULTS.get(y_key, 10)
+    return xs, ys
+
+
+def json_numbers(arr):
+    """float64 配列を JSON 出力用のリストにする（整数値は int に戻し、35.0 ではなく 35 と書き出す）"""
+    return [int(v) if v.is_integer() else v for v in arr.tolist()]
+
+
+def point_columns(merged, x_key, y_key):
+    """マージ済みポイント列の x, y を取り出す"""
+    xs, ys = coord_arrays([s._gi for s in merged], x_key, y_key)
+    return json_numbers(xs), json_numbers(ys)
+
+
+_FIELD_MARKER_SIZES = {}  # size_field → グローバルインデックス順のマーカーサイズ配列
+
+
+def field_marker_sizes(size_field):
+    """size_field のマーカーサイズを全スタジオ分まとめて計算（フィールドごとに1回）
+
+    人数等の大きな値は対数スケーリング、0〜1 のスコア/比率値は線形スケーリング (5px〜41px)
+    """
+    sizes = _FIELD_MARKER_SIZES.get(size_field)
+    if sizes is None:
+        vals = np.fromiter((getattr(s, size_field) or 0 for s in studios), dtype=np.float64)
+        sizes = log_marker_sizes(vals)
+        ratio = (vals > 0) & (vals <= 1)
+        sizes[ratio] = np.clip(5 + vals[ratio] * 40, 5, 41)
+        _FIELD_MARKER_SIZES[size_field] = sizes
+    return sizes
+
+
+def point_marker_sizes(merged, size_field):
+    """マージ済みポイント列のマーカーサイズ（統合ポイントは先頭スタジオの値）"""
+    return field_marker_sizes(size_field)[[s._gi for s in merged]].tolist()
+
+
 def merge_overlapping(studio_list, x_key="original_score", size_key="size_current_num"):
-    """同一座標のスタジオをマージし、ホバー・ラベルを統合"""
+    """同一座標のスタジオをマージし、ホバー・ラベルを統合
+
+    戻り値は (マージ済みポイント列, 元スタジオ列)。元スタジオ列は単独ポイントなら None
+    """
     groups = {}
-    for s in studio_list:
-        x = s.get(x_key, s["original_score"])
-        y = s.get(size_key, 10) or 10
-        key = (x, y)
-        groups.setdefault(key, []).append(s)
+    for i, s in enumerate(studio_list):
+        groups.setdefault((studio_x(s, x_key), studio_y(s, size_key)), []).append(i)
 
     merged = []
-    for (x, y), studios in groups.items():
-        if len(studios) == 1:
-            merged.append(studios[0])
-        else:
-            combined = dict(studios[0])
-            combined["name"] = "<br>".join(s["name"] for s in studios)
-            combined["_hover_parts"] = studios
-            merged.append(combined)
-    return merged
-
-
-def build_point_map(studio_list, x_key="original_score", size_key="size_current_num"):
-    """各マージポイントが元のどのスタジオに対応するかのマッピングを構築"""
-    merged = merge_overlapping(studio_list, x_key, size_key)
-    point_map = []
-    for s in merged:
-        if "_hover_parts" in s:
-            indices = [studio_global_idx[id(p)] for p in s["_hover_parts"]]
-        else:
-            indices = [studio_global_idx[id(s)]]
-        point_map.append(indices)
-    return point_map
+    parts_list = []
+    for idxs in groups.values():
+        point, parts = merge_parts([studio_list[i] for i in idxs])
+        merged.append(point)
+        parts_list.append(parts)
+    return merged, parts_list
+
+
+def merge_parts(parts):
+    """同一座標のスタジオ列を1ポイントにまとめる
+
+    戻り値は (代表ポイント, 元スタジオ列)。1社ならそのスタジオと None を返す
+    代表ポイントは先頭スタジオ（ラベルは point_labels で元スタジオ列から作る）
+    """
+    if len(parts) == 1:
+        return parts[0], None
+    return parts[0], parts
+
+
+def shared_axis_points(members):
+    """共通軸のマージ・ラベル配置から members に含まれるスタジオ分を切り出す
+
+    戻り値は (マージ済みポイント列, 元スタジオ列, textposition 列)
+    """
+    gis = {s._gi for s in members}
+    merged = []
+    parts_list = []
+    text_positions = []
+    for group, pos in zip(SHARED_GROUPS, SHARED_TEXT_POSITIONS):
+        group_parts = [p for p in group if p._gi in gis]
+        if group_parts:
+            point, parts = merge_parts(group_parts)
+            merged.append(point)
+            parts_list.append(parts)
+            text_positions.append(pos)
+    return merged, parts_list, text_positions
+
+
+def point_labels(merged, parts_list, trace_type, label=attrgetter("name")):
+    """マージ済みポイント列のラベル（統合ポイントはトレース種別に応じた LABEL_JOINERS で連結）
+
+    label はスタジオ1社分のラベルを返す関数（省略時はスタジオ名）
+    """
+    joiner = LABEL_JOINERS[trace_type]
+    return [
+        joiner.join(label(p) for p in parts) if parts is not None else label(s)
+        for s, parts in zip(merged, parts_list)
+    ]
+
+
+def merged_point_map(merged, parts_list):
+    """マージ済みポイント列から、各ポイントに対応する元スタジオのインデックス列を構築"""
+    return [
+        [p._gi for p in parts] if parts is not None else [s._gi]
+        for s, parts in zip(merged, parts_list)
+    ]
+
+
+# タイトル以外の共通レイアウト（make_layout で title だけ差し替える）
+_BASE_LAYOUT = dict(
+    xaxis=dict(
+        title=dict(text="← 受託          オリジナル →", font=dict(size=14)),
+        range=AXIS_RANGE_X,
+        dtick=0.1,
+        gridcolor=COLOR_GRID,
+        zeroline=False,
+        tickformat=".1f",
+    ),
+    yaxis=dict(
+        title=dict(text="人数規模（人）", font=dict(size=14)),
+        type="log",
+        range=AXIS_RANGE_Y_LOG,
+        gridcolor=COLOR_GRID,
+        zeroline=False,
+        tickformat=",d",
+    ),
+    plot_bgcolor="white",
+    paper_bgcolor="white",
+    dragmode="pan",
+    hovermode="closest",
+    hoverdistance=30,
+    legend=dict(
+        x=0.01, y=0.99,
+        bgcolor="rgba(255,255,255,0.9)",
+        bordercolor="#ccc", borderwidth=1,
+        font=dict(size=11),
+    ),
+    margin=dict(l=80, r=40, t=80, b=60),
+    width=CHART_WIDTH,
+    height=CHART_HEIGHT,
+)
 
 
 def make_layout(title_text):
-    return dict(
-        xaxis=dict(
-            title=dict(text="← 受託          オリジナル →", font=dict(size=14)),
-            range=AXIS_RANGE_X,
-            dtick=0.1,
-            gridcolor=COLOR_GRID,
-            zeroline=False,
-            tickformat=".1f",
-        ),
-        yaxis=dict(
-            title=dict(text="人数規模（人）", font=dict(size=14)),
-            type="log",
-            range=AXIS_RANGE_Y_LOG,
-            dtick=None,
-            gridcolor=COLOR_GRID,
-            zeroline=False,
-            tickformat=",d",
-        ),
-        title=dict(text=title_text, x=0.5, y=0.965, font=dict(size=16)),
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        dragmode="pan",
-        hovermode="closest",
-        hoverdistance=30,
-        legend=dict(
-            x=0.01, y=0.99,
-            bgcolor="rgba(255,255,255,0.9)",
-            bordercolor="#ccc", borderwidth=1,
-            font=dict(size=11),
-        ),
-        margin=dict(l=80, r=40, t=140, b=60),
-        width=CHART_WIDTH,
-        height=CHART_HEIGHT,
-    )
+    return {**_BASE_LAYOUT, "title": dict(text=title_text, x=0.5, y=0.965, font=dict(size=16))}
+
+
+def _hover_ai(ai, s):
+    """AI活用行（none は省略、詳細があれば括弧書き）"""
+    if ai == "none":
+        return None
+    ai_text = f"AI活用: {LABEL_NAMES['ai_adoption_level'].get(ai, ai)}"
+    detail = s.ai_adoption_detail
+    return f"{ai_text} ({detail})" if detail else ai_text
+
+
+# 拡張ホバーの任意行: (フィールド, 整形関数(値, スタジオ))
+# 値が None・空文字・空リストのフィールドは行ごと省略する（0 は表示する）
+_HOVER_FIELDS = (
+    ("parent_company", lambda v, s: f"親会社: {v}"),
+    ("ownership_type", lambda v, s: f"所有形態: {LABEL_NAMES['ownership_type'].get(v, v)}"),
+    ("ai_adoption_level", _hover_ai),
+    ("revenue_billion_yen", lambda v, s: f"売上: {v}億円 ({_or_unknown(s.revenue_year)}年)"),
+    ("operating_margin", lambda v, s: f"営業利益率: {v*100:.1f}%"),
+    ("licensing_ratio", lambda v, s: f"版権収入比率: {v*100:.0f}%"),
+    ("primary_platform", lambda v, s: f"主要PF: {', '.join(v)}"),
+    ("years_to_profitability", lambda v, s: f"黒字化年数: {v}年"),
+)
+_HOVER_EMPTY = (None, "", [])
+
+
+def _or_unknown(v):
+    return "?" if v is None else v
 
 
 def hover_text(s, size_key="size_current_num"):
     """拡張ホバーテキスト（新フィールドをnull安全に表示）"""
-    works = ", ".join(s.get("notable_works", [])[:3])
-    region_label = "国内" if s.get("region") == "domestic" else "海外"
-
-    lines = [
-        f"<b>{s['name']}</b>",
+    region_label = "国内" if s.region == "domestic" else "海外"
+    optional = (fmt(v, s) for name, fmt in _HOVER_FIELDS if (v := getattr(s, name)) not in _HOVER_EMPTY)
+    return "<br>".join([
+        f"<b>{s.name}</b>",
         f"分類: {region_label}",
-        f"設立: {s.get('founded', '?')}年",
-        f"人数: {s.get(size_key, '?')}人",
-        f"オリジナルスコア: {s.get('original_score', '?')}",
+        f"設立: {_or_unknown(s.founded)}年",
+        f"人数: {_or_unknown(getattr(s, size_key))}人",
+        f"オリジナルスコア: {_or_unknown(s.original_score)}",
+        *filter(None, optional),
+        f"代表作: {s._works_str}",
+    ])
+
+
+def cached_hover_text(s, size_key="size_current_num"):
+    """元スタジオのホバーテキスト（キャッシュがない size_key はその場で生成）"""
+    cache = _HOVER_CACHE.get(size_key)
+    if cache is None:
+        return hover_text(s, size_key)
+    return cache[s._gi]
+
+
+def merged_hover_texts(merged, parts_list, size_key="size_current_num"):
+    """マージ済みポイント列のホバーテキスト（統合ポイントは区切り線で連結）"""
+    return [
+        HOVER_SEPARATOR.join(cached_hover_text(p, size_key) for p in parts) if parts is not None
+        else cached_hover_text(s, size_key)
+        for s, parts in zip(merged, parts_list)
     ]
 
-    # 親会社
-    parent = s.get("parent_company")
-    if parent:
-        lines.append(f"親会社: {parent}")
-
-    # 所有形態
-    ot = s.get("ownership_type")
-    if ot:
-        ot_label = LABEL_NAMES.get("ownership_type", {}).get(ot, ot)
-        lines.append(f"所有形態: {ot_label}")
-
-    # AI活用
-    ai = s.get("ai_adoption_level")
-    if ai and ai != "none":
-        ai_label = LABEL_NAMES.get("ai_adoption_level", {}).get(ai, ai)
-        detail = s.get("ai_adoption_detail", "")
-        ai_text = f"AI活用: {ai_label}"
-        if detail:
-            ai_text += f" ({detail})"
-        lines.append(ai_text)
-
-    # 売上
-    rev = s.get("revenue_billion_yen")
-    if rev is not None:
-        rev_year = s.get("revenue_year", "?")
-        lines.append(f"売上: {rev}億円 ({rev_year}年)")
-
-    # 営業利益率
-    margin = s.get("operating_margin")
-    if margin is not None:
-        lines.append(f"営業利益率: {margin*100:.1f}%")
-
-    # 版権収入比率
-    lic = s.get("licensing_ratio")
-    if lic is not None:
-        lines.append(f"版権収入比率: {lic*100:.0f}%")
-
-    # 主要PF
-    pf = s.get("primary_platform", [])
-    if pf:
-        lines.append(f"主要PF: {', '.join(pf)}")
-
-    # 黒字化年数
-    ytp = s.get("years_to_profitability")
-    if ytp is not None:
-        lines.append(f"黒字化年数: {ytp}年")
-
-    lines.append(f"代表作: {works}")
-
-    return "<br>".join(lines)
-
 
 def make_scatter(studio_list, color, name, size_key="size_current_num",
                  opacity=1.0, symbol="circle", marker_size=None, show_labels=True,
-                 x_key="original_score", size_field=None):
+                 x_key="original_score", size_field=None, textfont=None, label_func=None):
+    """textfont / label_func を渡すとラベルの書式・文言を差し替える（label_func はスタジオ1社分のラベルを返す）
+
+    戻り値は (トレース, ポイントマップ)
+    """
     if marker_size is None:
         marker_size = MARKER_SIZE
 
     # 座標重複スタジオをマージ
-    studio_list = merge_overlapping(studio_list, x_key, size_key)
+    studio_list, parts_list = merge_overlapping(studio_list, x_key, size_key)
 
     text_positions = resolve_label_positions(studio_list, size_key, x_key) if show_labels else ["middle right"] * len(studio_list)
 
     # ホバーテキスト生成（マージされたスタジオは統合表示）
-    hover_texts = []
-    for s in studio_list:
-        if "_hover_parts" in s:
-            hover_texts.append("<br>───────────<br>".join(hover_text(part, size_key) for part in s["_hover_parts"]))
-        else:
-            hover_texts.append(hover_text(s, size_key))
+    hover_texts = merged_hover_texts(studio_list, parts_list, size_key)
 
     # 動的マーカーサイズ
     if size_field:
-        sizes = []
-        for s in studio_list:
-            val = s.get(size_field)
-            if val and val > 0:
-                sizes.append(max(6, min(30, 6 + 8 * math.log10(val))))
-            else:
-                sizes.append(8)
-        marker_size = sizes
-
-    return go.Scatter(
-        x=[s.get(x_key, s["original_score"]) for s in studio_list],
-        y=[s.get(size_key, 10) or 10 for s in studio_list],
+        marker_size = point_marker_sizes(studio_list, size_field)
+
+    trace_type = scatter_type(len(studio_list))
+    xs, ys = point_columns(studio_list, x_key, size_key)
+    labels = None
+    if show_labels:
+        labels = point_labels(studio_list, parts_list, trace_type, label_func or attrgetter("name"))
+    tr = dict(
+        type=trace_type,
+        x=xs,
+        y=ys,
         mode="markers+text" if show_labels else "markers",
         marker=dict(
             size=marker_size,
@@ -332,71 +561,74 @@ def make_scatter(studio_list, color, name, size_key="size_current_num",
             line=dict(width=1, color="white"),
             symbol=symbol,
         ),
-        text=[s["name"] for s in studio_list] if show_labels else None,
+        text=labels,
         textposition=text_positions,
-        textfont=dict(size=9, color=color),
+        textfont=textfont if textfont is not None else dict(size=9, color=color),
         hovertext=hover_texts,
         hoverinfo="text",
         name=name,
     )
+    return tr, merged_point_map(studio_list, parts_list)
 
 
 def make_categorical_scatter(studio_list, color_field, palette, label_map,
                              x_key="original_score", y_key="size_current_num",
-                             size_field=None, legend_prefix=""):
-    """カテゴリカル色分けのスキャッタートレースをグループ別に生成"""
+                             size_field=None, legend_prefix="", shared_layout=False,
+                             symbol="circle", categories=None):
+    """カテゴリカル色分けのスキャッタートレースをグループ別に生成
+
+    shared_layout=True のときは共通軸（SHARED_AXES）のマージ・ラベル配置を使う（x_key / y_key は SHARED_AXES と一致させる）
+    categories を渡すとその順にトレースを作り、含まれないカテゴリは描かない（省略時は出現順）
+    戻り値は (トレース列, トレースごとのポイントマップ列)
+    """
+    if shared_layout and (x_key, y_key) != SHARED_AXES:
+        raise ValueError(f"shared_layout=True は共通軸 {SHARED_AXES} 専用です（指定: {(x_key, y_key)}）")
+
     groups = {}
     for s in studio_list:
-        val = s.get(color_field, "unknown")
+        val = getattr(s, color_field)
         if val is None:
             val = "unknown"
         groups.setdefault(val, []).append(s)
+    if categories is not None:
+        groups = {c: groups[c] for c in categories if c in groups}
 
     scatter_traces = []
+    point_maps = []
     for cat_val, cat_studios in groups.items():
         color = palette.get(cat_val, "#95A5A6")
         label = label_map.get(cat_val, cat_val)
         legend_name = f"{legend_prefix}{label}" if legend_prefix else label
 
-        merged = merge_overlapping(cat_studios, x_key, y_key)
-        text_positions = resolve_label_positions(merged, y_key, x_key)
+        if shared_layout:
+            merged, parts_list, text_positions = shared_axis_points(cat_studios)
+        else:
+            merged, parts_list = merge_overlapping(cat_studios, x_key, y_key)
+            text_positions = resolve_label_positions(merged, y_key, x_key)
+        point_maps.append(merged_point_map(merged, parts_list))
 
-        hover_texts = []
-        for s in merged:
-            if "_hover_parts" in s:
-                hover_texts.append("<br>───────────<br>".join(hover_text(part, y_key) for part in s["_hover_parts"]))
-            else:
-                hover_texts.append(hover_text(s, y_key))
+        hover_texts = merged_hover_texts(merged, parts_list, y_key)
 
         # 動的マーカーサイズ
         ms = MARKER_SIZE
         if size_field:
-            sizes = []
-            for s in merged:
-                val = s.get(size_field)
-                if val and val > 0:
-                    if val <= 1:
-                        # スコア/比率値 (0-1): 線形スケーリング (5px〜41px)
-                        sizes.append(max(5, min(41, 5 + val * 40)))
-                    else:
-                        # 人数等の大きな値: 対数スケーリング
-                        sizes.append(max(6, min(30, 6 + 8 * math.log10(val))))
-                else:
-                    sizes.append(8)
-            ms = sizes
-
-        tr = go.Scatter(
-            x=[s.get(x_key, s.get("original_score", 0)) for s in merged],
-            y=[s.get(y_key, 10) or 10 for s in merged],
+            ms = point_marker_sizes(merged, size_field)
+
+        trace_type = scatter_type(len(merged))
+        xs, ys = point_columns(merged, x_key, y_key)
+        tr = dict(
+            type=trace_type,
+            x=xs,
+            y=ys,
             mode="markers+text",
             marker=dict(
                 size=ms,
                 color=color,
                 opacity=1.0,
                 line=dict(width=1, color="white"),
-                symbol="circle",
+                symbol=symbol,
             ),
-            text=[s["name"] for s in merged],
+            text=point_labels(merged, parts_list, trace_type),
             textposition=text_positions,
             textfont=dict(size=9, color=color),
             hovertext=hover_texts,
@@ -404,36 +636,35 @@ def make_categorical_scatter(studio_list, color_field, palette, label_map,
             name=legend_name,
         )
         scatter_traces.append(tr)
-    return scatter_traces
+    return scatter_traces, point_maps
 
 
-GRADIENT_STEPS = 8  # グラデーション分割数
+GRADIENT_STEPS = 3  # グラデーション分割数
 
 
 def make_growth_line_traces(studio_list, color, region_label):
-    """成長軌跡の線をグラデーション付きで生成"""
+    """成長軌跡の線をグラデーション付きで生成（WebGL描画）"""
+    idx = [s._gi for s in studio_list]
+    x_start, y_start = coord_arrays(idx, "original_score_founded", "size_founded_num")
+    x_end = COLS["original_score"][idx]
+    y_end = COLS["size_current_num"][idx]
+
+    # 各区切り点の座標 (GRADIENT_STEPS + 1, スタジオ数)
+    t = np.linspace(0.0, 1.0, GRADIENT_STEPS + 1)
+    xs = (x_start + np.outer(t, x_end - x_start)).tolist()
+    ys = (y_start + np.outer(t, y_end - y_start)).tolist()
+
     line_traces = []
     for step in range(GRADIENT_STEPS):
-        t0 = step / GRADIENT_STEPS
-        t1 = (step + 1) / GRADIENT_STEPS
         opacity = 0.08 + 0.77 * ((step + 1) / GRADIENT_STEPS) ** 2
         width = 2.5 + 1.5 * (step / (GRADIENT_STEPS - 1))
 
-        x_seg = []
-        y_seg = []
-        for s in studio_list:
-            x_start = s.get("original_score_founded", s["original_score"])
-            x_end = s["original_score"]
-            y_start = s["size_founded_num"] or 10
-            y_end = s["size_current_num"]
-            x0 = x_start + (x_end - x_start) * t0
-            x1 = x_start + (x_end - x_start) * t1
-            y0 = y_start + (y_end - y_start) * t0
-            y1 = y_start + (y_end - y_start) * t1
-            x_seg.extend([x0, x1, None])
-            y_seg.extend([y0, y1, None])
-
-        tr = go.Scatter(
+        # スタジオごとに [始点, 終点, None] の並び（JS側のフィルタがこの並びを前提にする）
+        x_seg = [v for x0, x1 in zip(xs[step], xs[step + 1]) for v in (x0, x1, None)]
+        y_seg = [v for y0, y1 in zip(ys[step], ys[step + 1]) for v in (y0, y1, None)]
+
+        tr = dict(
+            type="scattergl",
             x=x_seg, y=y_seg,
             mode="lines",
             line=dict(color=color, width=width),
@@ -446,12 +677,26 @@ def make_growth_line_traces(studio_list, color, region_label):
     return line_traces
 
 
-def get_primary_platform(s):
-    """スタジオの主要プラットフォーム（最上位）を返す"""
-    pf = s.get("primary_platform", [])
-    if not pf:
-        return "Other"
-    return pf[0]
+# --- ホバーテキストキャッシュ（グローバルインデックス順）---
+# 人数系の size_key は全ビューで共通なので、スタジオごとに一度だけ生成する
+HOVER_CURRENT = [hover_text(s, "size_current_num") for s in studios]
+HOVER_FOUNDED = [hover_text(s, "size_founded_num") for s in studios]
+_HOVER_CACHE = {"size_current_num": HOVER_CURRENT, "size_founded_num": HOVER_FOUNDED}
+
+# --- 共通軸（original_score × size_current_num）のマージ・ラベル配置 ---
+# AI活用度・所有構造・配信PFの各ビューはカテゴリ別トレースを同じ軸に重ねて描くため、
+# 重複マージとラベル衝突回避は全スタジオで一度だけ行い、各トレースはそこから切り出す
+SHARED_AXES = ("original_score", "size_current_num")
+_shared_merged, _shared_parts = merge_overlapping(studios, *SHARED_AXES)
+SHARED_GROUPS = [parts or [s] for s, parts in zip(_shared_merged, _shared_parts)]
+SHARED_TEXT_POSITIONS = resolve_label_positions(_shared_merged, SHARED_AXES[1], SHARED_AXES[0])
+
+# --- マーカーサイズ（グローバルインデックス順に一括計算）---
+# ビュー6: 社員数 → 8〜35px の対数スケール
+SIZE_MARKER_BIG_ALL = log_marker_sizes(
+    np.fromiter((s.size_current_num or 0 for s in studios), dtype=np.float64),
+    base=8, scale=10, max_size=35, default=10,
+)
 
 
 # ==================================================================
@@ -462,83 +707,79 @@ visibility_map = {"founded": [], "current": [], "growth": []}
 trace_point_maps = {}  # trace_index -> [[studio_idx, ...], ...]
 
 # --- ビュー1: 設立時マップ ---
-tr_dom_founded = make_scatter(domestic, COLOR_DOMESTIC, "国内スタジオ", "size_founded_num")
+tr_dom_founded, pm = make_scatter(buckets.domestic, COLOR_DOMESTIC, "国内スタジオ", "size_founded_num")
 traces.append(tr_dom_founded)
-trace_point_maps[len(traces) - 1] = build_point_map(domestic, "original_score", "size_founded_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["founded"].append(len(traces) - 1)
 
-tr_intl_founded = make_scatter(international, COLOR_INTERNATIONAL, "海外スタジオ", "size_founded_num")
+tr_intl_founded, pm = make_scatter(buckets.international, COLOR_INTERNATIONAL, "海外スタジオ", "size_founded_num")
 traces.append(tr_intl_founded)
-trace_point_maps[len(traces) - 1] = build_point_map(international, "original_score", "size_founded_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["founded"].append(len(traces) - 1)
 
 # --- ビュー2: 現在マップ ---
-tr_dom_current = make_scatter(domestic, COLOR_DOMESTIC, "国内スタジオ", "size_current_num")
+tr_dom_current, pm = make_scatter(buckets.domestic, COLOR_DOMESTIC, "国内スタジオ", "size_current_num")
 traces.append(tr_dom_current)
-trace_point_maps[len(traces) - 1] = build_point_map(domestic, "original_score", "size_current_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["current"].append(len(traces) - 1)
 
-tr_intl_current = make_scatter(international, COLOR_INTERNATIONAL, "海外スタジオ", "size_current_num")
+tr_intl_current, pm = make_scatter(buckets.international, COLOR_INTERNATIONAL, "海外スタジオ", "size_current_num")
 traces.append(tr_intl_current)
-trace_point_maps[len(traces) - 1] = build_point_map(international, "original_score", "size_current_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["current"].append(len(traces) - 1)
 
 # --- ビュー3: 成長軌跡マップ ---
-growth_dom = [s for s in growth_studios if s["region"] == "domestic"]
-growth_intl = [s for s in growth_studios if s["region"] == "international"]
+growth_dom = buckets.growth_dom
+growth_intl = buckets.growth_intl
+
+
+def founded_label(s):
+    """始点マーカー用の設立年ラベル"""
+    return f"({s.founded})"
+
 
 # 始点マーカー（設立時）
-tr_growth_start_dom = make_scatter(growth_dom, COLOR_DOMESTIC, "国内（設立時）",
-                                   "size_founded_num", opacity=0.4, marker_size=MARKER_SIZE_SMALL, show_labels=True,
-                                   x_key="original_score_founded")
-tr_growth_start_dom.textfont = dict(size=9, color="rgba(52,152,219,0.6)")
-growth_dom_merged = merge_overlapping(growth_dom, "original_score_founded", "size_founded_num")
-tr_growth_start_dom.text = [
-    "<br>".join(f"({p['founded']})" for p in s["_hover_parts"]) if "_hover_parts" in s
-    else f"({s['founded']})"
-    for s in growth_dom_merged
-]
+tr_growth_start_dom, pm = make_scatter(growth_dom, COLOR_DOMESTIC, "国内（設立時）",
+                                       "size_founded_num", opacity=0.4, marker_size=MARKER_SIZE_SMALL, show_labels=True,
+                                       x_key="original_score_founded",
+                                       textfont=dict(size=9, color="rgba(52,152,219,0.6)"),
+                                       label_func=founded_label)
 traces.append(tr_growth_start_dom)
-trace_point_maps[len(traces) - 1] = build_point_map(growth_dom, "original_score_founded", "size_founded_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["growth"].append(len(traces) - 1)
 
-tr_growth_start_intl = make_scatter(growth_intl, COLOR_INTERNATIONAL, "海外（設立時）",
-                                    "size_founded_num", opacity=0.4, marker_size=MARKER_SIZE_SMALL, show_labels=True,
-                                    x_key="original_score_founded")
-tr_growth_start_intl.textfont = dict(size=9, color="rgba(231,76,60,0.6)")
-growth_intl_merged = merge_overlapping(growth_intl, "original_score_founded", "size_founded_num")
-tr_growth_start_intl.text = [
-    "<br>".join(f"({p['founded']})" for p in s["_hover_parts"]) if "_hover_parts" in s
-    else f"({s['founded']})"
-    for s in growth_intl_merged
-]
+tr_growth_start_intl, pm = make_scatter(growth_intl, COLOR_INTERNATIONAL, "海外（設立時）",
+                                        "size_founded_num", opacity=0.4, marker_size=MARKER_SIZE_SMALL, show_labels=True,
+                                        x_key="original_score_founded",
+                                        textfont=dict(size=9, color="rgba(231,76,60,0.6)"),
+                                        label_func=founded_label)
 traces.append(tr_growth_start_intl)
-trace_point_maps[len(traces) - 1] = build_point_map(growth_intl, "original_score_founded", "size_founded_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["growth"].append(len(traces) - 1)
 
 # 終点マーカー（現在）
-tr_growth_end_dom = make_scatter(growth_dom, COLOR_DOMESTIC, "国内（現在）", "size_current_num")
+tr_growth_end_dom, pm = make_scatter(growth_dom, COLOR_DOMESTIC, "国内（現在）", "size_current_num")
 traces.append(tr_growth_end_dom)
-trace_point_maps[len(traces) - 1] = build_point_map(growth_dom, "original_score", "size_current_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["growth"].append(len(traces) - 1)
 
-tr_growth_end_intl = make_scatter(growth_intl, COLOR_INTERNATIONAL, "海外（現在）", "size_current_num")
+tr_growth_end_intl, pm = make_scatter(growth_intl, COLOR_INTERNATIONAL, "海外（現在）", "size_current_num")
 traces.append(tr_growth_end_intl)
-trace_point_maps[len(traces) - 1] = build_point_map(growth_intl, "original_score", "size_current_num")
+trace_point_maps[len(traces) - 1] = pm
 visibility_map["growth"].append(len(traces) - 1)
 
 # 軌跡線トレース（グラデーション付き）
 visibility_map["growth_lines"] = []
 growth_line_studio_indices = {}
 
-growth_dom_global = [studio_global_idx[id(s)] for s in growth_dom]
+growth_dom_global = [s._gi for s in growth_dom]
 for tr in make_growth_line_traces(growth_dom, COLOR_DOMESTIC, "国内"):
     traces.append(tr)
     visibility_map["growth"].append(len(traces) - 1)
     visibility_map["growth_lines"].append(len(traces) - 1)
     growth_line_studio_indices[len(traces) - 1] = growth_dom_global
 
-growth_intl_global = [studio_global_idx[id(s)] for s in growth_intl]
+growth_intl_global = [s._gi for s in growth_intl]
 for tr in make_growth_line_traces(growth_intl, COLOR_INTERNATIONAL, "海外"):
     traces.append(tr)
     visibility_map["growth"].append(len(traces) - 1)
@@ -549,39 +790,19 @@ for tr in make_growth_line_traces(growth_intl, COLOR_INTERNATIONAL, "海外"):
 # --- ビュー4: ビジネスモデル分析マップ ---
 # X: original_score, Y: size_current_num, Size: ip_ownership_score, Color: business_model
 visibility_map["business_model"] = []
-bm_studios = [s for s in studios if s.get("size_current_num") is not None]
-for tr in make_categorical_scatter(
-    bm_studios, "business_model",
+bm_traces, bm_point_maps = make_categorical_scatter(
+    buckets.bm, "business_model",
     COLOR_PALETTES["business_model"],
     LABEL_NAMES["business_model"],
     x_key="original_score",
     y_key="size_current_num",
     size_field="ip_ownership_score",
-):
+)
+for tr, point_map in zip(bm_traces, bm_point_maps):
     traces.append(tr)
-    trace_point_maps[len(traces) - 1] = build_point_map(
-        [s for s in bm_studios if s.get("business_model") == tr.name.replace("", "")],
-        "original_score", "size_current_num"
-    )
+    trace_point_maps[len(traces) - 1] = point_map
     visibility_map["business_model"].append(len(traces) - 1)
 
-# build_point_map for view 4 needs to be recalculated per group
-# Rebuild properly
-_bm_trace_start = len(traces) - len(visibility_map["business_model"])
-for i, view_idx in enumerate(visibility_map["business_model"]):
-    # Extract category from trace name
-    tr = traces[view_idx]
-    cat_label = tr.name
-    # Find matching studios
-    cat_key = None
-    for k, v in LABEL_NAMES["business_model"].items():
-        if v == cat_label:
-            cat_key = k
-            break
-    if cat_key:
-        cat_studios = [s for s in bm_studios if s.get("business_model") == cat_key]
-        trace_point_maps[view_idx] = build_point_map(cat_studios, "original_score", "size_current_num")
-
 
 # --- ビュー5: AI活用度マップ ---
 # X: original_score, Y: size_current_num, Color: ai_adoption_level
@@ -589,48 +810,23 @@ visibility_map["ai_adoption"] = []
 # シンボル: region別
 ai_symbol_map = {"domestic": "circle", "international": "diamond"}
 for region_key, region_studios, region_label in [
-    ("domestic", domestic, "国内"),
-    ("international", international, "海外")
+    ("domestic", buckets.domestic, "国内"),
+    ("international", buckets.international, "海外"),
 ]:
-    symbol = ai_symbol_map[region_key]
-    for ai_level in ["none", "experimental", "production", "core"]:
-        level_studios = [s for s in region_studios if s.get("ai_adoption_level") == ai_level]
-        if not level_studios:
-            continue
-        color = COLOR_PALETTES["ai_adoption_level"][ai_level]
-        ai_label = LABEL_NAMES["ai_adoption_level"][ai_level]
-        legend_name = f"{region_label} - {ai_label}"
-
-        merged = merge_overlapping(level_studios, "original_score", "size_current_num")
-        text_positions = resolve_label_positions(merged, "size_current_num", "original_score")
-
-        hover_texts = []
-        for s in merged:
-            if "_hover_parts" in s:
-                hover_texts.append("<br>───────────<br>".join(hover_text(part, "size_current_num") for part in s["_hover_parts"]))
-            else:
-                hover_texts.append(hover_text(s, "size_current_num"))
-
-        tr = go.Scatter(
-            x=[s.get("original_score", 0) for s in merged],
-            y=[s.get("size_current_num", 10) or 10 for s in merged],
-            mode="markers+text",
-            marker=dict(
-                size=MARKER_SIZE,
-                color=color,
-                opacity=1.0,
-                line=dict(width=1, color="white"),
-                symbol=symbol,
-            ),
-            text=[s["name"] for s in merged],
-            textposition=text_positions,
-            textfont=dict(size=9, color=color),
-            hovertext=hover_texts,
-            hoverinfo="text",
-            name=legend_name,
-        )
+    ai_traces, ai_point_maps = make_categorical_scatter(
+        region_studios, "ai_adoption_level",
+        COLOR_PALETTES["ai_adoption_level"],
+        LABEL_NAMES["ai_adoption_level"],
+        x_key="original_score",
+        y_key="size_current_num",
+        legend_prefix=f"{region_label} - ",
+        shared_layout=True,
+        symbol=ai_symbol_map[region_key],
+        categories=["none", "experimental", "production", "core"],
+    )
+    for tr, point_map in zip(ai_traces, ai_point_maps):
         traces.append(tr)
-        trace_point_maps[len(traces) - 1] = build_point_map(level_studios, "original_score", "size_current_num")
+        trace_point_maps[len(traces) - 1] = point_map
         visibility_map["ai_adoption"].append(len(traces) - 1)
 
 
@@ -638,50 +834,37 @@ for region_key, region_studios, region_label in [
 # X: operating_margin, Y: revenue_billion_yen, Size: size_current_num
 # Color: licensing_ratio (continuous)
 visibility_map["revenue"] = []
-revenue_studios = [s for s in studios if s.get("revenue_billion_yen") is not None]
+revenue_studios = buckets.revenue
 
 if revenue_studios:
-    merged_rev = merge_overlapping(revenue_studios, "operating_margin", "revenue_billion_yen")
+    merged_rev, parts_rev = merge_overlapping(revenue_studios, "operating_margin", "revenue_billion_yen")
     text_positions_rev = resolve_label_positions(merged_rev, "revenue_billion_yen", "operating_margin")
 
-    hover_texts_rev = []
-    for s in merged_rev:
-        if "_hover_parts" in s:
-            hover_texts_rev.append("<br>───────────<br>".join(hover_text(part, "revenue_billion_yen") for part in s["_hover_parts"]))
-        else:
-            hover_texts_rev.append(hover_text(s, "revenue_billion_yen"))
+    hover_texts_rev = merged_hover_texts(merged_rev, parts_rev, "revenue_billion_yen")
 
     # 色: licensing_ratio → 連続スケール
-    colors_rev = []
-    for s in merged_rev:
-        lic = s.get("licensing_ratio")
-        if lic is not None:
-            colors_rev.append(lic)
-        else:
-            colors_rev.append(0)
+    idx_rev = [s._gi for s in merged_rev]
+    colors_rev = np.nan_to_num(COLS["licensing_ratio"][idx_rev], nan=0)
 
-    sizes_rev = []
-    for s in merged_rev:
-        val = s.get("size_current_num", 100)
-        if val and val > 0:
-            sizes_rev.append(max(8, min(35, 8 + 10 * math.log10(val))))
-        else:
-            sizes_rev.append(10)
+    sizes_rev = SIZE_MARKER_BIG_ALL[idx_rev]
 
-    tr_rev = go.Scatter(
-        x=[s.get("operating_margin", 0) or 0 for s in merged_rev],
-        y=[s.get("revenue_billion_yen", 1) or 1 for s in merged_rev],
+    type_rev = scatter_type(len(merged_rev))
+    xs_rev, ys_rev = point_columns(merged_rev, "operating_margin", "revenue_billion_yen")
+    tr_rev = dict(
+        type=type_rev,
+        x=xs_rev,
+        y=ys_rev,
         mode="markers+text",
         marker=dict(
-            size=sizes_rev,
-            color=colors_rev,
+            size=json_numbers(sizes_rev),
+            color=json_numbers(colors_rev),
             colorscale=[[0, "#E74C3C"], [0.5, "#F39C12"], [1, "#27AE60"]],
             cmin=0, cmax=1,
-            colorbar=dict(title="版権収入比率", x=1.02, len=0.5),
+            colorbar=dict(title=dict(text="版権収入比率"), x=1.02, len=0.5),
             opacity=1.0,
             line=dict(width=1, color="white"),
         ),
-        text=[s["name"] for s in merged_rev],
+        text=point_labels(merged_rev, parts_rev, type_rev),
         textposition=text_positions_rev,
         textfont=dict(size=9),
         hovertext=hover_texts_rev,
@@ -689,56 +872,42 @@ if revenue_studios:
         name="収益データ公開企業",
     )
     traces.append(tr_rev)
-    trace_point_maps[len(traces) - 1] = build_point_map(revenue_studios, "operating_margin", "revenue_billion_yen")
+    trace_point_maps[len(traces) - 1] = merged_point_map(merged_rev, parts_rev)
     visibility_map["revenue"].append(len(traces) - 1)
 
 
 # --- ビュー7: 所有構造・企業グループマップ ---
 # X: original_score, Y: size_current_num, Color: ownership_type
 visibility_map["ownership"] = []
-for tr in make_categorical_scatter(
+own_traces, own_point_maps = make_categorical_scatter(
     studios, "ownership_type",
     COLOR_PALETTES["ownership_type"],
     LABEL_NAMES["ownership_type"],
     x_key="original_score",
     y_key="size_current_num",
-):
+    shared_layout=True,
+)
+for tr, point_map in zip(own_traces, own_point_maps):
     traces.append(tr)
-    cat_label = tr.name
-    cat_key = None
-    for k, v in LABEL_NAMES["ownership_type"].items():
-        if v == cat_label:
-            cat_key = k
-            break
-    if cat_key:
-        cat_studios = [s for s in studios if s.get("ownership_type") == cat_key]
-        trace_point_maps[len(traces) - 1] = build_point_map(cat_studios, "original_score", "size_current_num")
+    trace_point_maps[len(traces) - 1] = point_map
     visibility_map["ownership"].append(len(traces) - 1)
 
 
 # --- ビュー8: 配信PF関係マップ ---
 # X: original_score, Y: size_current_num, Color: primary_platform top
 visibility_map["platform"] = []
-pf_groups = {}
-for s in studios:
-    pf = get_primary_platform(s)
-    pf_groups.setdefault(pf, []).append(s)
-
-for pf_name, pf_studios in pf_groups.items():
+for pf_name, pf_studios in buckets.by_pf.items():
     color = COLOR_PALETTES["primary_platform_color"].get(pf_name, "#95A5A6")
-    merged = merge_overlapping(pf_studios, "original_score", "size_current_num")
-    text_positions = resolve_label_positions(merged, "size_current_num", "original_score")
+    merged, parts_list, text_positions = shared_axis_points(pf_studios)
 
-    hover_texts = []
-    for s in merged:
-        if "_hover_parts" in s:
-            hover_texts.append("<br>───────────<br>".join(hover_text(part, "size_current_num") for part in s["_hover_parts"]))
-        else:
-            hover_texts.append(hover_text(s, "size_current_num"))
+    hover_texts = merged_hover_texts(merged, parts_list, "size_current_num")
 
-    tr = go.Scatter(
-        x=[s.get("original_score", 0) for s in merged],
-        y=[s.get("size_current_num", 10) or 10 for s in merged],
+    trace_type = scatter_type(len(merged))
+    xs, ys = point_columns(merged, "original_score", "size_current_num")
+    tr = dict(
+        type=trace_type,
+        x=xs,
+        y=ys,
         mode="markers+text",
         marker=dict(
             size=MARKER_SIZE,
@@ -747,7 +916,7 @@ for pf_name, pf_studios in pf_groups.items():
             line=dict(width=1, color="white"),
             symbol="circle",
         ),
-        text=[s["name"] for s in merged],
+        text=point_labels(merged, parts_list, trace_type),
         textposition=text_positions,
         textfont=dict(size=9, color=color),
         hovertext=hover_texts,
@@ -755,7 +924,7 @@ for pf_name, pf_studios in pf_groups.items():
         name=pf_name,
     )
     traces.append(tr)
-    trace_point_maps[len(traces) - 1] = build_point_map(pf_studios, "original_score", "size_current_num")
+    trace_point_maps[len(traces) - 1] = merged_point_map(merged, parts_list)
     visibility_map["platform"].append(len(traces) - 1)
 
 
@@ -764,23 +933,21 @@ for pf_name, pf_studios in pf_groups.items():
 visibility_map["profitability"] = []
 
 # 黒字化データありスタジオ
-prof_studios = [s for s in studios if s.get("years_to_profitability") is not None]
+prof_studios = buckets.prof
 # 黒字化データなしスタジオ
-nonprof_studios = [s for s in studios if s.get("years_to_profitability") is None]
+nonprof_studios = buckets.nonprof
 
 if nonprof_studios:
-    merged_np = merge_overlapping(nonprof_studios, "founded", "size_current_num")
+    merged_np, parts_np = merge_overlapping(nonprof_studios, "founded", "size_current_num")
     text_positions_np = resolve_label_positions(merged_np, "size_current_num", "founded")
-    hover_texts_np = []
-    for s in merged_np:
-        if "_hover_parts" in s:
-            hover_texts_np.append("<br>───────────<br>".join(hover_text(part, "size_current_num") for part in s["_hover_parts"]))
-        else:
-            hover_texts_np.append(hover_text(s, "size_current_num"))
-
-    tr_np = go.Scatter(
-        x=[s.get("founded", 2000) for s in merged_np],
-        y=[s.get("size_current_num", 10) or 10 for s in merged_np],
+    hover_texts_np = merged_hover_texts(merged_np, parts_np, "size_current_num")
+
+    type_np = scatter_type(len(merged_np))
+    xs_np, ys_np = point_columns(merged_np, "founded", "size_current_num")
+    tr_np = dict(
+        type=type_np,
+        x=xs_np,
+        y=ys_np,
         mode="markers+text",
         marker=dict(
             size=MARKER_SIZE,
@@ -788,7 +955,7 @@ if nonprof_studios:
             opacity=0.5,
             line=dict(width=1, color="white"),
         ),
-        text=[s["name"] for s in merged_np],
+        text=point_labels(merged_np, parts_np, type_np),
         textposition=text_positions_np,
         textfont=dict(size=8, color="#999"),
         hovertext=hover_texts_np,
@@ -796,26 +963,21 @@ if nonprof_studios:
         name="黒字化データなし",
     )
     traces.append(tr_np)
-    trace_point_maps[len(traces) - 1] = build_point_map(nonprof_studios, "founded", "size_current_num")
+    trace_point_maps[len(traces) - 1] = merged_point_map(merged_np, parts_np)
     visibility_map["profitability"].append(len(traces) - 1)
 
 if prof_studios:
-    merged_p = merge_overlapping(prof_studios, "founded", "size_current_num")
+    merged_p, parts_p = merge_overlapping(prof_studios, "founded", "size_current_num")
     text_positions_p = resolve_label_positions(merged_p, "size_current_num", "founded")
-    hover_texts_p = []
-    texts_p = []
-    for s in merged_p:
-        if "_hover_parts" in s:
-            hover_texts_p.append("<br>───────────<br>".join(hover_text(part, "size_current_num") for part in s["_hover_parts"]))
-            texts_p.append("<br>".join(f"{p['name']} ({p.get('years_to_profitability','?')}年)" for p in s["_hover_parts"]))
-        else:
-            hover_texts_p.append(hover_text(s, "size_current_num"))
-            ytp = s.get("years_to_profitability", "?")
-            texts_p.append(f"{s['name']} ({ytp}年)")
-
-    tr_p = go.Scatter(
-        x=[s.get("founded", 2000) for s in merged_p],
-        y=[s.get("size_current_num", 10) or 10 for s in merged_p],
+    hover_texts_p = merged_hover_texts(merged_p, parts_p, "size_current_num")
+    type_p = scatter_type(len(merged_p))
+    texts_p = point_labels(merged_p, parts_p, type_p, lambda p: f"{p.name} ({p.years_to_profitability}年)")
+
+    xs_p, ys_p = point_columns(merged_p, "founded", "size_current_num")
+    tr_p = dict(
+        type=type_p,
+        x=xs_p,
+        y=ys_p,
         mode="markers+text",
         marker=dict(
             size=14,
@@ -832,7 +994,7 @@ if prof_studios:
         name="黒字化データあり",
     )
     traces.append(tr_p)
-    trace_point_maps[len(traces) - 1] = build_point_map(prof_studios, "founded", "size_current_num")
+    trace_point_maps[len(traces) - 1] = merged_point_map(merged_p, parts_p)
     visibility_map["profitability"].append(len(traces) - 1)
 
 
@@ -846,11 +1008,11 @@ VIEW_KEYS = ["founded", "current", "growth", "business_model", "ai_adoption",
              "revenue", "ownership", "platform", "profitability"]
 
 
-def make_visibility(view_key):
-    vis = [False] * total_traces
-    for idx in visibility_map[view_key]:
-        vis[idx] = True
-    return vis
+# ビューごとの visible 配列（ボタン・初期表示で共有するため1回だけ作る）
+VIS_CACHE = {}
+for view_key in VIEW_KEYS:
+    shown = set(visibility_map[view_key])
+    VIS_CACHE[view_key] = [i in shown for i in range(total_traces)]
 
 
 titles = {
@@ -866,94 +1028,26 @@ titles = {
 }
 
 # 軸設定
-axis_configs = {
-    "founded": {
-        "xaxis.title.text": "← 受託          オリジナル →",
-        "xaxis.range": AXIS_RANGE_X,
-        "xaxis.dtick": 0.1,
-        "xaxis.tickformat": ".1f",
-        "yaxis.title.text": "人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
-    },
-    "current": {
-        "xaxis.title.text": "← 受託          オリジナル →",
-        "xaxis.range": AXIS_RANGE_X,
-        "xaxis.dtick": 0.1,
-        "xaxis.tickformat": ".1f",
-        "yaxis.title.text": "人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
-    },
-    "growth": {
-        "xaxis.title.text": "← 受託          オリジナル →",
-        "xaxis.range": AXIS_RANGE_X,
-        "xaxis.dtick": 0.1,
-        "xaxis.tickformat": ".1f",
-        "yaxis.title.text": "人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
-    },
-    "business_model": {
-        "xaxis.title.text": "← 受託          オリジナル →",
-        "xaxis.range": AXIS_RANGE_X,
-        "xaxis.dtick": 0.1,
-        "xaxis.tickformat": ".1f",
-        "yaxis.title.text": "人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
-    },
-    "ai_adoption": {
-        "xaxis.title.text": "← 受託          オリジナル →",
-        "xaxis.range": AXIS_RANGE_X,
-        "xaxis.dtick": 0.1,
-        "xaxis.tickformat": ".1f",
-        "yaxis.title.text": "人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
-    },
+# 人数規模（対数）× オリジナルスコアの共通軸。ビューごとの差分だけを上書きする
+BASE_PEOPLE_AXES = {
+    "xaxis.title.text": "← 受託          オリジナル →",
+    "xaxis.range": AXIS_RANGE_X,
+    "xaxis.dtick": 0.1,
+    "xaxis.tickformat": ".1f",
+    "yaxis.title.text": "人数規模（人）",
+    "yaxis.type": "log",
+    "yaxis.range": AXIS_RANGE_Y_LOG,
+    "yaxis.dtick": None,
+    "yaxis.tickformat": ",d",
+}
+AXIS_OVERRIDES = {
     "revenue": {
         "xaxis.title.text": "営業利益率",
         "xaxis.range": [-0.05, 0.40],
         "xaxis.dtick": 0.05,
         "xaxis.tickformat": ".0%",
         "yaxis.title.text": "売上高（億円）",
-        "yaxis.type": "log",
         "yaxis.range": [1.0, 3.5],
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
-    },
-    "ownership": {
-        "xaxis.title.text": "← 受託          オリジナル →",
-        "xaxis.range": AXIS_RANGE_X,
-        "xaxis.dtick": 0.1,
-        "xaxis.tickformat": ".1f",
-        "yaxis.title.text": "人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
-    },
-    "platform": {
-        "xaxis.title.text": "← 受託          オリジナル →",
-        "xaxis.range": AXIS_RANGE_X,
-        "xaxis.dtick": 0.1,
-        "xaxis.tickformat": ".1f",
-        "yaxis.title.text": "人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
     },
     "profitability": {
         "xaxis.title.text": "設立年",
@@ -961,12 +1055,9 @@ axis_configs = {
         "xaxis.dtick": 10,
         "xaxis.tickformat": "d",
         "yaxis.title.text": "現在の人数規模（人）",
-        "yaxis.type": "log",
-        "yaxis.range": AXIS_RANGE_Y_LOG,
-        "yaxis.dtick": None,
-        "yaxis.tickformat": ",d",
     },
 }
+axis_configs = {k: {**BASE_PEOPLE_AXES, **AXIS_OVERRIDES.get(k, {})} for k in VIEW_KEYS}
 
 # M&Aアノテーション（ビュー7用）
 ownership_annotations = [
@@ -980,10 +1071,10 @@ ownership_annotations = [
     ),
 ]
 
-# ビュー6用アノテーション
+# ビュー6用アノテーション（プロット領域の上端に沿わせ、上余白 t を変えてもタイトルと重ならないようにする）
 revenue_annotations = [
     dict(
-        x=0.5, y=1.07, xref="paper", yref="paper",
+        x=0.5, y=1, xref="paper", yref="paper", yanchor="bottom", yshift=4,
         text="* 上場企業等の公開データのみ表示。マーカーサイズは社員数、色は版権収入比率",
         showarrow=False,
         font=dict(size=10, color="#999"),
@@ -992,9 +1083,6 @@ revenue_annotations = [
 
 
 # ボタン作成
-buttons_row1 = []
-buttons_row2 = []
-
 button_configs = [
     ("founded", "1. 設立時"),
     ("current", "2. 現在"),
@@ -1007,99 +1095,90 @@ button_configs = [
     ("profitability", "9. 黒字化"),
 ]
 
-for i, (view_key, label) in enumerate(button_configs):
-    ac = axis_configs[view_key]
-    annotations = []
-    if view_key == "ownership":
-        annotations = ownership_annotations
-    elif view_key == "revenue":
-        annotations = revenue_annotations
-
-    btn = dict(
-        label=f"  {label}  ",
-        method="update",
-        args=[
-            {"visible": make_visibility(view_key)},
-            dict(
-                **{"title.text": titles[view_key], "annotations": annotations},
-                **ac,
-            ),
-        ],
-    )
-    if i < 5:
-        buttons_row1.append(btn)
-    else:
-        buttons_row2.append(btn)
+# ビュー切替時に layout へ上書きする差分（JS の switchView が Plotly.react 1回で反映する）
+view_annotations = {"ownership": ownership_annotations, "revenue": revenue_annotations}
+view_layouts = {
+    view_key: {"title.text": titles[view_key], "annotations": view_annotations.get(view_key, []), **axis_configs[view_key]}
+    for view_key in VIEW_KEYS
+}
+
+# ビュー切替ボタン（HTML）
+view_buttons_html = "\n".join(
+    f'  <button class="view-btn{" active" if view_key == "founded" else ""}" data-view="{view_key}"'
+    f' onclick="switchView(\'{view_key}\')">{label}</button>'
+    for view_key, label in button_configs
+)
 
 
 # ==================================================================
 # 図の作成
 # ==================================================================
-fig = go.Figure(data=traces)
-
+# トレースは Plotly の検証を通さない素の dict で組み立てる
 # 初期状態: ビュー1（設立時マップ）
-initial_vis = make_visibility("founded")
-for i, tr in enumerate(fig.data):
-    tr.visible = initial_vis[i]
+for tr, vis in zip(traces, VIS_CACHE["founded"]):
+    tr["visible"] = vis
 
-fig.update_layout(
+layout = dict(
     **make_layout(titles["founded"]),
-    updatemenus=[
-        dict(
-            type="buttons",
-            direction="right",
-            x=0.5, xanchor="center",
-            y=1.17,
-            showactive=True,
-            buttons=buttons_row1,
-            bgcolor="#f8f8f8",
-            bordercolor="#999",
-            font=dict(size=12),
-            pad=dict(t=3, b=3, l=6, r=6),
-        ),
-        dict(
-            type="buttons",
-            direction="right",
-            x=0.5, xanchor="center",
-            y=1.09,
-            showactive=True,
-            buttons=buttons_row2,
-            bgcolor="#f0f0f0",
-            bordercolor="#999",
-            font=dict(size=12),
-            pad=dict(t=3, b=3, l=6, r=6),
-        ),
-    ],
+    template=pio.templates[pio.templates.default].to_plotly_json(),
 )
+fig = dict(data=traces, layout=layout)
 
 # --- フィルタ用JSデータ生成 ---
-studios_js = json.dumps([{
+def to_js_json_bytes(obj):
+    """JS 埋め込み用のJSON（UTF-8 バイト列。orjson があればそちらで直列化、int キーは文字列化）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode("ascii")
+
+
+def to_js_json(obj):
+    """JS 埋め込み用のJSON文字列"""
+    return to_js_json_bytes(obj).decode("utf-8")
+
+
+studios_data = [{
     "idx": i,
-    "name": s["name"],
-    "name_en": s.get("name_en", ""),
-    "region": s["region"],
-    "founded": s.get("founded"),
-    "size_founded_num": s.get("size_founded_num") or 10,
-    "size_current_num": s.get("size_current_num"),
-    "notable_works": s.get("notable_works", []),
-    "parent_company": s.get("parent_company"),
-    "ownership_type": s.get("ownership_type"),
-    "business_model": s.get("business_model"),
-    "ai_adoption_level": s.get("ai_adoption_level"),
-    "ai_adoption_detail": s.get("ai_adoption_detail"),
-    "primary_platform": s.get("primary_platform", []),
-    "ip_ownership_score": s.get("ip_ownership_score"),
-    "revenue_billion_yen": s.get("revenue_billion_yen"),
-    "operating_margin": s.get("operating_margin"),
-    "years_to_profitability": s.get("years_to_profitability"),
-} for i, s in enumerate(studios)], ensure_ascii=False)
-
-trace_point_maps_js = json.dumps({str(k): v for k, v in trace_point_maps.items()})
-growth_line_studio_js = json.dumps({str(k): v for k, v in growth_line_studio_indices.items()})
-visibility_map_js = json.dumps(visibility_map)
+    "name": s.name,
+    "name_en": s.name_en,
+    "region": s.region,
+    "founded": s.founded,
+    "size_founded_num": s.size_founded_num or 10,
+    "size_current_num": s.size_current_num,
+    "notable_works": s.notable_works or [],
+    "parent_company": s.parent_company,
+    "ownership_type": s.ownership_type,
+    "business_model": s.business_model,
+    "ai_adoption_level": s.ai_adoption_level,
+    "ai_adoption_detail": s.ai_adoption_detail,
+    "primary_platform": s.primary_platform or [],
+    "ip_ownership_score": s.ip_ownership_score,
+    "revenue_billion_yen": s.revenue_billion_yen,
+    "operating_margin": s.operating_margin,
+    "years_to_profitability": s.years_to_profitability,
+} for i, s in enumerate(studios)]
+
+# フィルタJSが参照するデータを1つのペイロードにまとめて1回で直列化し、
+# gzip + base64 で埋め込む（ブラウザ側で DecompressionStream により展開）
+# False にすると圧縮せず素の JSON のまま埋め込む（DecompressionStream 非対応ブラウザ向け）
+EMBED_DATA_GZIP = True
+
+data_json = to_js_json_bytes({
+    "studios": studios_data,
+    "trace_point_maps": trace_point_maps,
+    "growth_line_studios": growth_line_studio_indices,
+})
+if EMBED_DATA_GZIP:
+    data_gz_b64 = '"' + base64.b64encode(gzip.compress(data_json, mtime=0)).decode("ascii") + '"'
+    data_raw = "null"
+else:
+    data_gz_b64 = "null"
+    data_raw = data_json.decode("utf-8")
 
 # --- 出力 ---
-chart_div = fig.to_html(
+chart_div = pio.to_html(
+    fig,
+    validate=False,
     include_plotlyjs="cdn",
     full_html=False,
     config={"displayModeBar": True, "scrollZoom": True},
@@ -1133,6 +1212,16 @@ full_html = f"""<!DOCTYPE html>
   .controls-bar .toggle-btn.on {{ background: #d0e8ff; border-color: #69a; }}
   .controls-bar .toggle-btn.off {{ background: #f0f0f0; color: #999; }}
   .sep {{ border-left: 1px solid #ccc; height: 20px; margin: 0 4px; }}
+  .view-bar {{
+    display: flex; align-items: center; justify-content: center; gap: 6px; flex-wrap: wrap;
+    padding: 6px 16px; background: #f8f8f8; border-bottom: 1px solid #ddd;
+  }}
+  .view-bar .view-btn {{
+    padding: 4px 12px; border: 1px solid #999; border-radius: 4px;
+    background: #fff; cursor: pointer; font-size: 12px;
+  }}
+  .view-bar .view-btn:hover {{ background: #e8e8e8; }}
+  .view-bar .view-btn.active {{ background: #d0e8ff; border-color: #69a; }}
   .filter-bar {{
     display: flex; align-items: center; gap: 8px; flex-wrap: wrap;
     padding: 8px 16px; background: #fafafa;
@@ -1165,7 +1254,7 @@ full_html = f"""<!DOCTYPE html>
     font-size: 11px; color: #888; font-weight: bold;
   }}
   .main-content {{
-    display: flex; height: calc(100vh - 130px);
+    display: flex; height: calc(100vh - 170px);
   }}
   .chart-area {{
     flex: 1; min-width: 0; overflow: hidden;
@@ -1264,6 +1353,9 @@ full_html = f"""<!DOCTYPE html>
   <button onclick="resetFilters()">リセット</button>
   <span class="filter-count" id="filter-count">表示: {len(studios)}/{len(studios)}社</span>
 </div>
+<div class="view-bar" id="view-bar">
+{view_buttons_html}
+</div>
 <div class="main-content">
   <div class="chart-area">{chart_div}</div>
   <div class="studio-list-panel">
@@ -1275,23 +1367,79 @@ full_html = f"""<!DOCTYPE html>
 var AXIS_RANGE_X = {json.dumps(AXIS_RANGE_X)};
 var AXIS_RANGE_Y_LINEAR = {json.dumps(AXIS_RANGE_Y_LINEAR)};
 var AXIS_RANGE_Y_LOG = {json.dumps(AXIS_RANGE_Y_LOG)};
+// ビュー切替・軌跡線トグル用（展開を待たずに使えるよう圧縮データとは別に埋め込む）
+var VIS_CACHE = {to_js_json(VIS_CACHE)};
+var VIEW_LAYOUTS = {to_js_json(view_layouts)};
+var growthLineIndices = {to_js_json(visibility_map["growth_lines"])};
 var isLogScale = true;
-var STUDIOS = {studios_js};
-var TRACE_POINT_MAP = {trace_point_maps_js};
-var GROWTH_LINE_STUDIOS = {growth_line_studio_js};
-var VISIBILITY_MAP = {visibility_map_js};
-var growthLineIndices = {json.dumps(visibility_map["growth_lines"])};
+var currentView = 'founded';
 var linesVisible = true;
-var totalStudios = STUDIOS.length;
 
-var AI_LABELS = {json.dumps(LABEL_NAMES["ai_adoption_level"], ensure_ascii=False)};
-var OWN_LABELS = {json.dumps(LABEL_NAMES["ownership_type"], ensure_ascii=False)};
+// フィルタ用データ（gzip + base64。圧縮しないときは DATA_RAW に素の JSON）
+// 展開が終わるまで DATA 以下は null
+var DATA_GZ_B64 = {data_gz_b64};
+var DATA_RAW = {data_raw};
+var DATA = null;
+var STUDIOS = null;
+var TRACE_POINT_MAP = null;
+var GROWTH_LINE_STUDIOS = null;
+var totalStudios = 0;
+
+function decodeData() {{
+  if (DATA_GZ_B64 === null) return Promise.resolve(DATA_RAW);
+  if (typeof DecompressionStream !== 'function') {{
+    return Promise.reject(new Error('DecompressionStream is not supported'));
+  }}
+  var bytes = Uint8Array.from(atob(DATA_GZ_B64), function(c) {{ return c.charCodeAt(0); }});
+  var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).text().then(JSON.parse);
+}}
+
+// 展開できたら true。失敗してもフィルタ以外（ビュー切替・ホバー）は動くようにする
+function loadData() {{
+  return decodeData().then(function(data) {{
+    DATA = data;
+    STUDIOS = DATA.studios;
+    TRACE_POINT_MAP = DATA.trace_point_maps;
+    GROWTH_LINE_STUDIOS = DATA.growth_line_studios;
+    totalStudios = STUDIOS.length;
+    // 文字列検索の対象（名前・英語名・代表作）を小文字化して1回だけ作る
+    for (var i = 0; i < STUDIOS.length; i++) {{
+      var s = STUDIOS[i];
+      s._haystack = (s.name + ' ' + s.name_en + ' ' + s.notable_works.join(' ')).toLowerCase();
+    }}
+    return true;
+  }}).catch(function(err) {{
+    DATA = null;
+    console.error('フィルタ用データを展開できませんでした', err);
+    document.getElementById('filter-count').textContent = 'フィルタは利用できません';
+    return false;
+  }});
+}}
+
+// ページの読み込みと並行して展開を始める
+var dataReady = loadData();
+
+var AI_LABELS = {to_js_json(LABEL_NAMES["ai_adoption_level"])};
+var OWN_LABELS = {to_js_json(LABEL_NAMES["ownership_type"])};
+var HOVER_SEPARATOR = {to_js_json(HOVER_SEPARATOR)};
 
 // --- 企業リストパネル ---
+// 企業リストの項目要素（STUDIOS と同じ順）
+var STUDIO_ITEM_NODES = [];
+
+function makeEl(tag, className, text) {{
+  var el = document.createElement(tag);
+  el.className = className;
+  if (text) el.textContent = text;
+  return el;
+}}
+
 function buildStudioList() {{
   var container = document.getElementById('studio-list-body');
   if (!container) return;
-  var html = '';
+  var frag = document.createDocumentFragment();
+  STUDIO_ITEM_NODES = [];
   for (var i = 0; i < STUDIOS.length; i++) {{
     var s = STUDIOS[i];
     var dotColor = s.region === 'domestic' ? '{COLOR_DOMESTIC}' : '{COLOR_INTERNATIONAL}';
@@ -1312,135 +1460,192 @@ function buildStudioList() {{
     var ownBadgeClass = 'badge-own-' + (ownType === 'group_company' ? 'group' : ownType);
     var ownLabel = OWN_LABELS[ownType] || ownType;
 
-    html += '<div class="studio-item" data-idx="' + i + '">'
-      + '<div class="name"><span class="region-dot" style="background:' + dotColor + '"></span>' + s.name + '</div>'
-      + '<div class="meta">' + regionLabel + ' | ' + foundedText + ' | ' + sizeText + parentText + '</div>'
-      + '<div class="badges">'
-      + '<span class="badge ' + aiBadgeClass + '">AI: ' + aiLabel + '</span>'
-      + '<span class="badge ' + ownBadgeClass + '">' + ownLabel + '</span>'
-      + '</div>'
-      + (works ? '<div class="works">' + works + '</div>' : '')
-      + '</div>';
+    var item = makeEl('div', 'studio-item');
+    item.setAttribute('data-idx', i);
+
+    var name = makeEl('div', 'name');
+    var dot = makeEl('span', 'region-dot');
+    dot.style.background = dotColor;
+    name.appendChild(dot);
+    name.appendChild(document.createTextNode(s.name));
+    item.appendChild(name);
+
+    item.appendChild(makeEl('div', 'meta', regionLabel + ' | ' + foundedText + ' | ' + sizeText + parentText));
+
+    var badges = makeEl('div', 'badges');
+    badges.appendChild(makeEl('span', 'badge ' + aiBadgeClass, 'AI: ' + aiLabel));
+    badges.appendChild(makeEl('span', 'badge ' + ownBadgeClass, ownLabel));
+    item.appendChild(badges);
+
+    if (works) item.appendChild(makeEl('div', 'works', works));
+
+    frag.appendChild(item);
+    STUDIO_ITEM_NODES.push(item);
   }}
-  container.innerHTML = html;
+  container.appendChild(frag);
 }}
 
 function updateStudioList(matchResults) {{
-  var items = document.querySelectorAll('.studio-item');
   var visibleCount = 0;
-  for (var i = 0; i < items.length; i++) {{
-    var idx = parseInt(items[i].getAttribute('data-idx'));
-    if (matchResults[idx]) {{
-      items[i].classList.remove('hidden');
-      visibleCount++;
-    }} else {{
-      items[i].classList.add('hidden');
-    }}
+  for (var i = 0; i < STUDIO_ITEM_NODES.length; i++) {{
+    STUDIO_ITEM_NODES[i].classList.toggle('hidden', !matchResults[i]);
+    if (matchResults[i]) visibleCount++;
   }}
   document.getElementById('list-count').textContent = visibleCount;
 }}
 
-// 元データ保存用
+// 元データ保存用（最初にフィルタを適用するときにトレースごとに作る）
 var _originalData = {{}};
+// 直近の applyFilters で非表示にしたスタジオがあるか
+var _filtersActive = false;
+// 直近に反映したフィルタ入力とビューの組（同じなら applyFilters は何もしない）
+var _lastFilterSig = null;
+
+// 数値配列を型付き配列で複製（成長軌跡線の区切り null は NaN にする。Plotly は NaN でも線を切る）
+function copyNumeric(arr, TypedArray) {{
+  return TypedArray.from(arr, function(v) {{ return v === null ? NaN : v; }});
+}}
 
-function initOriginalData() {{
-  var plotDiv = document.querySelector('.plotly-graph-div');
-  if (!plotDiv) return;
-  for (var i = 0; i < plotDiv.data.length; i++) {{
-    var d = plotDiv.data[i];
-    _originalData[i] = {{
-      x: d.x ? d.x.slice() : null,
-      y: d.y ? d.y.slice() : null,
+// トレース i の元データ（フィルタで書き換える属性だけ）を初回参照時に保存して返す。x のないトレースは null
+function ensureOriginal(plotDiv, i) {{
+  if (i in _originalData) return _originalData[i];
+  var d = plotDiv.data[i];
+  var orig = null;
+  if (d.x && i in GROWTH_LINE_STUDIOS) {{
+    // 成長軌跡線はフィルタのたびに作り直さず、作業用バッファの該当区間だけを書き換える
+    var x = copyNumeric(d.x, Float64Array);
+    var y = copyNumeric(d.y, Float64Array);
+    orig = {{
+      x: x,
+      y: y,
+      work_x: x.slice(),
+      work_y: y.slice(),
+      prev_match: new Uint8Array(GROWTH_LINE_STUDIOS[i].length).fill(1),
+    }};
+  }} else if (d.x) {{
+    orig = {{
+      n: d.x.length,
       hovertext: d.hovertext ? d.hovertext.slice() : null,
-      text: d.text ? d.text.slice() : null,
-      marker_opacity: d.marker ? (Array.isArray(d.marker.opacity) ? d.marker.opacity.slice() : d.marker.opacity) : null,
+      // 統合ポイントのホバーを元スタジオ単位に分割したもの（フィルタ時は選んで join するだけ）
+      hovertext_parts: d.hovertext ? d.hovertext.map(function(h) {{ return h ? h.split(HOVER_SEPARATOR) : []; }}) : null,
+      marker_opacity: d.marker ? (Array.isArray(d.marker.opacity) ? Float32Array.from(d.marker.opacity) : d.marker.opacity) : null,
       textfont_color: d.textfont ? (Array.isArray(d.textfont.color) ? d.textfont.color.slice() : d.textfont.color) : null,
     }};
   }}
+  _originalData[i] = orig;
+  return orig;
 }}
 
-function getCurrentView() {{
-  var plotDiv = document.querySelector('.plotly-graph-div');
-  if (!plotDiv) return 'founded';
-  for (var i = 0; i < plotDiv.data.length; i++) {{
-    if (plotDiv.data[i].visible === true) {{
-      for (var view in VISIBILITY_MAP) {{
-        if (view === 'growth_lines') continue;
-        if (VISIBILITY_MAP[view].indexOf(i) !== -1) return view;
-      }}
-    }}
-  }}
-  return 'founded';
+// 成長軌跡線の作業用バッファを元の座標・全件表示の状態に戻す
+function resetGrowthBuffers(orig) {{
+  orig.work_x.set(orig.x);
+  orig.work_y.set(orig.y);
+  orig.prev_match.fill(1);
 }}
 
-function studioMatchesFilter(studio) {{
-  var yearMin = document.getElementById('filter-year-min').value;
-  var yearMax = document.getElementById('filter-year-max').value;
-  var showDom = document.getElementById('filter-domestic').checked;
-  var showIntl = document.getElementById('filter-international').checked;
-  var sizeMin = document.getElementById('filter-size-min').value;
-  var sizeMax = document.getElementById('filter-size-max').value;
-  var searchText = document.getElementById('filter-search').value.toLowerCase().trim();
+// フィルタ入力要素（ロード時に1回だけ取得）
+var INPUTS = {{
+  yearMin: document.getElementById('filter-year-min'),
+  yearMax: document.getElementById('filter-year-max'),
+  showDom: document.getElementById('filter-domestic'),
+  showIntl: document.getElementById('filter-international'),
+  sizeMin: document.getElementById('filter-size-min'),
+  sizeMax: document.getElementById('filter-size-max'),
+  search: document.getElementById('filter-search'),
+  aiNone: document.getElementById('filter-ai-none'),
+  aiExp: document.getElementById('filter-ai-experimental'),
+  aiProd: document.getElementById('filter-ai-production'),
+  aiCore: document.getElementById('filter-ai-core'),
+  ownIndep: document.getElementById('filter-own-independent'),
+  ownSub: document.getElementById('filter-own-subsidiary'),
+  ownGroup: document.getElementById('filter-own-group'),
+}};
+
+function intOrNull(input) {{
+  return input.value ? parseInt(input.value) : null;
+}}
+
+// 現在のフィルタ入力をまとめて読み取る（applyFilters 1回につき1回）
+function readFilters() {{
+  return {{
+    yearMin: intOrNull(INPUTS.yearMin),
+    yearMax: intOrNull(INPUTS.yearMax),
+    showDom: INPUTS.showDom.checked,
+    showIntl: INPUTS.showIntl.checked,
+    sizeMin: intOrNull(INPUTS.sizeMin),
+    sizeMax: intOrNull(INPUTS.sizeMax),
+    sizeKey: currentView === 'founded' ? 'size_founded_num' : 'size_current_num',
+    searchText: INPUTS.search.value.toLowerCase().trim(),
+    ai: {{
+      none: INPUTS.aiNone.checked,
+      experimental: INPUTS.aiExp.checked,
+      production: INPUTS.aiProd.checked,
+      core: INPUTS.aiCore.checked,
+    }},
+    own: {{
+      independent: INPUTS.ownIndep.checked,
+      subsidiary: INPUTS.ownSub.checked,
+      group_company: INPUTS.ownGroup.checked,
+    }},
+  }};
+}}
 
+function matches(studio, F) {{
   // 地域フィルタ
-  if (studio.region === 'domestic' && !showDom) return false;
-  if (studio.region === 'international' && !showIntl) return false;
+  if (studio.region === 'domestic' && !F.showDom) return false;
+  if (studio.region === 'international' && !F.showIntl) return false;
 
   // 設立年フィルタ
-  if (yearMin && studio.founded && studio.founded < parseInt(yearMin)) return false;
-  if (yearMax && studio.founded && studio.founded > parseInt(yearMax)) return false;
+  if (F.yearMin !== null && studio.founded && studio.founded < F.yearMin) return false;
+  if (F.yearMax !== null && studio.founded && studio.founded > F.yearMax) return false;
 
   // 社員数フィルタ
-  var view = getCurrentView();
-  var sizeVal = (view === 'founded') ? studio.size_founded_num : studio.size_current_num;
-  if (sizeMin && sizeVal < parseInt(sizeMin)) return false;
-  if (sizeMax && sizeVal > parseInt(sizeMax)) return false;
+  var sizeVal = studio[F.sizeKey];
+  if (F.sizeMin !== null && sizeVal < F.sizeMin) return false;
+  if (F.sizeMax !== null && sizeVal > F.sizeMax) return false;
 
   // 文字列検索
-  if (searchText) {{
-    var haystack = (studio.name + ' ' + studio.name_en + ' ' + studio.notable_works.join(' ')).toLowerCase();
-    if (haystack.indexOf(searchText) === -1) return false;
-  }}
+  if (F.searchText && studio._haystack.indexOf(F.searchText) === -1) return false;
 
   // AI活用レベルフィルタ
-  var aiLevel = studio.ai_adoption_level || 'none';
-  var aiNone = document.getElementById('filter-ai-none').checked;
-  var aiExp = document.getElementById('filter-ai-experimental').checked;
-  var aiProd = document.getElementById('filter-ai-production').checked;
-  var aiCore = document.getElementById('filter-ai-core').checked;
-  if (aiLevel === 'none' && !aiNone) return false;
-  if (aiLevel === 'experimental' && !aiExp) return false;
-  if (aiLevel === 'production' && !aiProd) return false;
-  if (aiLevel === 'core' && !aiCore) return false;
+  if (F.ai[studio.ai_adoption_level || 'none'] === false) return false;
 
   // 所有形態フィルタ
-  var ownType = studio.ownership_type || 'independent';
-  var ownIndep = document.getElementById('filter-own-independent').checked;
-  var ownSub = document.getElementById('filter-own-subsidiary').checked;
-  var ownGroup = document.getElementById('filter-own-group').checked;
-  if (ownType === 'independent' && !ownIndep) return false;
-  if (ownType === 'subsidiary' && !ownSub) return false;
-  if (ownType === 'group_company' && !ownGroup) return false;
+  if (F.own[studio.ownership_type || 'independent'] === false) return false;
 
   return true;
 }}
 
-function applyFilters() {{
-  var plotDiv = document.querySelector('.plotly-graph-div');
-  if (!plotDiv) return;
-
-  var matchResults = STUDIOS.map(function(s) {{ return studioMatchesFilter(s); }});
-  var matchCount = matchResults.filter(function(m) {{ return m; }}).length;
+// フィルタ入力から各スタジオの表示可否を求め、件数表示と企業リストを更新する
+function evaluateFilters() {{
+  var F = readFilters();
+  var matchResults = new Array(STUDIOS.length);
+  var matchCount = 0;
+  for (var i = 0; i < STUDIOS.length; i++) {{
+    matchResults[i] = matches(STUDIOS[i], F);
+    if (matchResults[i]) matchCount++;
+  }}
   document.getElementById('filter-count').textContent = '表示: ' + matchCount + '/' + totalStudios + '社';
 
   updateStudioList(matchResults);
+  return {{ match: matchResults, count: matchCount }};
+}}
 
-  // スキャッタートレースのフィルタ適用
+// 表示可否からトレースの書き換え内容を作る（restyle / react 共通。変更不要なら null）
+function filterTraceUpdates(plotDiv, result) {{
+  var matchResults = result.match;
+
+  // 全社表示のまま変化がなければトレース更新は不要
+  if (result.count === totalStudios && !_filtersActive) return null;
+  _filtersActive = result.count !== totalStudios;
+
+  // スキャッタートレース
+  var opAll = [], tcAll = [], htAll = [], idxAll = [];
   for (var trIdx in TRACE_POINT_MAP) {{
     var ti = parseInt(trIdx);
     var pointMap = TRACE_POINT_MAP[trIdx];
-    var orig = _originalData[ti];
-    if (!orig || !orig.x) continue;
+    var orig = ensureOriginal(plotDiv, ti);
+    if (!orig) continue;
 
     var newOpacity = [];
     var newTextColor = [];
@@ -1450,20 +1655,23 @@ function applyFilters() {{
 
     for (var pi = 0; pi < pointMap.length; pi++) {{
       var studioIndices = pointMap[pi];
-      var anyMatch = studioIndices.some(function(si) {{ return matchResults[si]; }});
+      var anyMatch = false;
+      for (var k = 0; k < studioIndices.length; k++) {{
+        if (matchResults[studioIndices[k]]) {{ anyMatch = true; break; }}
+      }}
 
       if (anyMatch) {{
         newOpacity.push(typeof baseOpacity === 'number' ? baseOpacity : (baseOpacity ? baseOpacity[pi] : 1));
         newTextColor.push(typeof baseTextColor === 'string' ? baseTextColor : (baseTextColor ? baseTextColor[pi] : '#000'));
         if (studioIndices.length > 1 && orig.hovertext) {{
-          var parts = orig.hovertext[pi].split('<br>───────────<br>');
+          var parts = orig.hovertext_parts[pi];
           var filtered = [];
           for (var si = 0; si < studioIndices.length; si++) {{
             if (matchResults[studioIndices[si]] && parts[si]) {{
               filtered.push(parts[si]);
             }}
           }}
-          newHovertext.push(filtered.join('<br>───────────<br>'));
+          newHovertext.push(filtered.join(HOVER_SEPARATOR));
         }} else {{
           newHovertext.push(orig.hovertext ? orig.hovertext[pi] : '');
         }}
@@ -1474,90 +1682,198 @@ function applyFilters() {{
       }}
     }}
 
-    Plotly.restyle(plotDiv, {{
-      'marker.opacity': [newOpacity],
-      'textfont.color': [newTextColor],
-      'hovertext': [newHovertext],
-    }}, [ti]);
+    opAll.push(newOpacity);
+    tcAll.push(newTextColor);
+    htAll.push(newHovertext);
+    idxAll.push(ti);
   }}
 
-  // 成長軌跡線のフィルタ適用
+  // 成長軌跡線
+  var xAll = [], yAll = [], glIdxAll = [];
   for (var glIdx in GROWTH_LINE_STUDIOS) {{
     var gli = parseInt(glIdx);
     var studioList = GROWTH_LINE_STUDIOS[glIdx];
-    var orig = _originalData[gli];
-    if (!orig || !orig.x) continue;
-
-    var newX = orig.x.slice();
-    var newY = orig.y.slice();
+    var orig = ensureOriginal(plotDiv, gli);
+    if (!orig) continue;
 
+    // 前回から表示状態が変わったスタジオの [始点, 終点] だけを書き換える
+    var wx = orig.work_x, wy = orig.work_y, prev = orig.prev_match;
+    var changed = false;
     for (var si = 0; si < studioList.length; si++) {{
-      if (!matchResults[studioList[si]]) {{
-        newX[si * 3] = null;
-        newX[si * 3 + 1] = null;
-        newY[si * 3] = null;
-        newY[si * 3 + 1] = null;
+      var m = matchResults[studioList[si]] ? 1 : 0;
+      if (m === prev[si]) continue;
+      prev[si] = m;
+      changed = true;
+      for (var k = si * 3; k < si * 3 + 2; k++) {{
+        wx[k] = m ? orig.x[k] : NaN;
+        wy[k] = m ? orig.y[k] : NaN;
       }}
     }}
+    if (!changed) continue;
+
+    xAll.push(wx);
+    yAll.push(wy);
+    glIdxAll.push(gli);
+  }}
+
+  return {{
+    scatter: {{ idx: idxAll, opacity: opAll, textColor: tcAll, hovertext: htAll }},
+    growth: {{ idx: glIdxAll, x: xAll, y: yAll }},
+  }};
+}}
+
+// フィルタ入力とビューを連結した文字列（社員数フィルタはビューで対象が変わるので含める）
+function filterSignature() {{
+  var parts = [currentView];
+  for (var key in INPUTS) {{
+    var el = INPUTS[key];
+    parts.push(el.type === 'checkbox' ? (el.checked ? '1' : '0') : el.value);
+  }}
+  return parts.join('|');
+}}
+
+function applyFilters() {{
+  var plotDiv = document.querySelector('.plotly-graph-div');
+  if (!plotDiv || !DATA) return;
+
+  var sig = filterSignature();
+  if (sig === _lastFilterSig) return;
+  _lastFilterSig = sig;
 
+  var u = filterTraceUpdates(plotDiv, evaluateFilters());
+  if (!u) return;
+
+  // 全トレース分をまとめて1回で restyle
+  if (u.scatter.idx.length > 0) {{
     Plotly.restyle(plotDiv, {{
-      x: [newX],
-      y: [newY],
-    }}, [gli]);
+      'marker.opacity': u.scatter.opacity,
+      'textfont.color': u.scatter.textColor,
+      'hovertext': u.scatter.hovertext,
+    }}, u.scatter.idx);
+  }}
+  if (u.growth.idx.length > 0) {{
+    Plotly.restyle(plotDiv, {{ x: u.growth.x, y: u.growth.y }}, u.growth.idx);
   }}
 }}
 
-function resetFilters() {{
-  document.getElementById('filter-year-min').value = '';
-  document.getElementById('filter-year-max').value = '';
-  document.getElementById('filter-domestic').checked = true;
-  document.getElementById('filter-international').checked = true;
-  document.getElementById('filter-size-min').value = '';
-  document.getElementById('filter-size-max').value = '';
-  document.getElementById('filter-search').value = '';
-  document.getElementById('filter-ai-none').checked = true;
-  document.getElementById('filter-ai-experimental').checked = true;
-  document.getElementById('filter-ai-production').checked = true;
-  document.getElementById('filter-ai-core').checked = true;
-  document.getElementById('filter-own-independent').checked = true;
-  document.getElementById('filter-own-subsidiary').checked = true;
-  document.getElementById('filter-own-group').checked = true;
+// "xaxis.range" 形式のキーで更新した新しい layout を返す（書き換える階層だけ複製）
+function updatedLayout(layout, updates) {{
+  var out = Object.assign({{}}, layout);
+  for (var key in updates) {{
+    var path = key.split('.');
+    var obj = out;
+    for (var i = 0; i < path.length - 1; i++) {{
+      obj[path[i]] = Object.assign({{}}, obj[path[i]]);
+      obj = obj[path[i]];
+    }}
+    var v = updates[key];
+    obj[path[path.length - 1]] = Array.isArray(v) ? v.slice() : v;
+  }}
+  return out;
+}}
 
+// ビュー切替: 表示トレース・軸・タイトルとフィルタ結果を Plotly.react 1回で反映する
+function switchView(viewKey) {{
   var plotDiv = document.querySelector('.plotly-graph-div');
   if (!plotDiv) return;
+  currentView = viewKey;
 
+  var vis = VIS_CACHE[viewKey];
+  var data = plotDiv.data.map(function(t, i) {{ return Object.assign({{}}, t, {{ visible: vis[i] }}); }});
+
+  // フィルタ用データの展開前（または失敗時）はフィルタ結果を反映せずに切り替える
+  var u = null;
+  if (DATA) {{
+    _lastFilterSig = filterSignature();
+    u = filterTraceUpdates(plotDiv, evaluateFilters());
+  }}
+  if (u) {{
+    for (var j = 0; j < u.scatter.idx.length; j++) {{
+      var t = data[u.scatter.idx[j]];
+      t.marker = Object.assign({{}}, t.marker, {{ opacity: u.scatter.opacity[j] }});
+      t.textfont = Object.assign({{}}, t.textfont, {{ color: u.scatter.textColor[j] }});
+      t.hovertext = u.scatter.hovertext[j];
+    }}
+    // 作業用バッファは使い回すので、react が変更を検出できるよう複製を渡す
+    for (var j = 0; j < u.growth.idx.length; j++) {{
+      var g = data[u.growth.idx[j]];
+      g.x = u.growth.x[j].slice();
+      g.y = u.growth.y[j].slice();
+    }}
+  }}
+
+  Plotly.react(plotDiv, data, updatedLayout(plotDiv.layout, VIEW_LAYOUTS[viewKey]));
+
+  var buttons = document.querySelectorAll('.view-btn');
+  for (var b = 0; b < buttons.length; b++) {{
+    buttons[b].classList.toggle('active', buttons[b].getAttribute('data-view') === viewKey);
+  }}
+}}
+
+function resetFilters() {{
+  _lastFilterSig = null;
+  INPUTS.yearMin.value = '';
+  INPUTS.yearMax.value = '';
+  INPUTS.showDom.checked = true;
+  INPUTS.showIntl.checked = true;
+  INPUTS.sizeMin.value = '';
+  INPUTS.sizeMax.value = '';
+  INPUTS.search.value = '';
+  INPUTS.aiNone.checked = true;
+  INPUTS.aiExp.checked = true;
+  INPUTS.aiProd.checked = true;
+  INPUTS.aiCore.checked = true;
+  INPUTS.ownIndep.checked = true;
+  INPUTS.ownSub.checked = true;
+  INPUTS.ownGroup.checked = true;
+
+  // 入力欄は常に戻し、トレース・企業リストの復元はフィルタ用データの展開後だけ行う
+  var plotDiv = document.querySelector('.plotly-graph-div');
+  if (!plotDiv || !DATA) return;
+  _filtersActive = false;
+
+  var opAll = [], tcAll = [], htAll = [], idxAll = [];
   for (var trIdx in TRACE_POINT_MAP) {{
     var ti = parseInt(trIdx);
-    var orig = _originalData[ti];
+    var orig = ensureOriginal(plotDiv, ti);
     if (!orig) continue;
     var baseOpacity = orig.marker_opacity;
     var opArr = [];
     if (typeof baseOpacity === 'number') {{
-      for (var p = 0; p < orig.x.length; p++) opArr.push(baseOpacity);
-    }} else if (Array.isArray(baseOpacity)) {{
+      for (var p = 0; p < orig.n; p++) opArr.push(baseOpacity);
+    }} else if (ArrayBuffer.isView(baseOpacity)) {{
       opArr = baseOpacity.slice();
     }}
+    opAll.push(opArr.length > 0 ? opArr : orig.marker_opacity);
+    tcAll.push(orig.textfont_color);
+    htAll.push(orig.hovertext);
+    idxAll.push(ti);
+  }}
+  if (idxAll.length > 0) {{
     Plotly.restyle(plotDiv, {{
-      'marker.opacity': [opArr.length > 0 ? opArr : orig.marker_opacity],
-      'textfont.color': [orig.textfont_color],
-      'hovertext': [orig.hovertext],
-    }}, [ti]);
+      'marker.opacity': opAll,
+      'textfont.color': tcAll,
+      'hovertext': htAll,
+    }}, idxAll);
   }}
 
+  var xAll = [], yAll = [], glIdxAll = [];
   for (var glIdx in GROWTH_LINE_STUDIOS) {{
     var gli = parseInt(glIdx);
-    var orig = _originalData[gli];
+    var orig = ensureOriginal(plotDiv, gli);
     if (!orig) continue;
-    Plotly.restyle(plotDiv, {{
-      x: [orig.x],
-      y: [orig.y],
-    }}, [gli]);
+    resetGrowthBuffers(orig);
+    xAll.push(orig.work_x);
+    yAll.push(orig.work_y);
+    glIdxAll.push(gli);
+  }}
+  if (glIdxAll.length > 0) {{
+    Plotly.restyle(plotDiv, {{ x: xAll, y: yAll }}, glIdxAll);
   }}
 
   document.getElementById('filter-count').textContent = '表示: ' + totalStudios + '/' + totalStudios + '社';
 
-  var allItems = document.querySelectorAll('.studio-item');
-  for (var ai = 0; ai < allItems.length; ai++) {{ allItems[ai].classList.remove('hidden'); }}
+  for (var i = 0; i < STUDIO_ITEM_NODES.length; i++) {{ STUDIO_ITEM_NODES[i].classList.remove('hidden'); }}
   document.getElementById('list-count').textContent = totalStudios;
 }}
 
@@ -1622,34 +1938,87 @@ function resetMapPosition() {{
 
 // --- 近接ポイント同時ホバー表示 ---
 var isProximityHover = false;
+var PROXIMITY_RADIUS = 50;  // px
+// 格子セルのキー計算用（y 方向のセル番号がこの範囲に収まる限りキーは一意）
+var GRID_KEY_STRIDE = 1048576;
+// 表示中トレースの各点のピクセル座標と、PROXIMITY_RADIUS 四方の格子に振り分けた点の索引
+// （traces: traceIndex -> {{px, py}}、grid: セルキー -> [traceIndex, pointIndex, ...]）
+// 描画・軸変更のたびに破棄して次のホバーで作り直す
+var PIXEL_CACHE = null;
+
+function gridKey(cx, cy) {{
+  return cx * GRID_KEY_STRIDE + cy;
+}}
+
+function buildPixelCache(plotDiv) {{
+  var xaxis = plotDiv._fullLayout.xaxis;
+  var yaxis = plotDiv._fullLayout.yaxis;
+  var cache = {{}};
+  var grid = new Map();
+  for (var ci = 0; ci < plotDiv.data.length; ci++) {{
+    var trace = plotDiv.data[ci];
+    if (!trace.visible) continue;
+    if (!trace.x || !trace.hovertext) continue;
+    // Fx.hover の pointNumber 指定は Scattergl では効かないので、SVG の scatter だけを対象にする
+    if (trace.type === 'scattergl') continue;
+    var n = trace.x.length;
+    var px = new Float64Array(n);
+    var py = new Float64Array(n);
+    for (var pi = 0; pi < n; pi++) {{
+      var x = trace.x[pi];
+      if (x == null) {{
+        px[pi] = NaN;
+        continue;
+      }}
+      px[pi] = xaxis.d2p(x);
+      py[pi] = yaxis.d2p(trace.y[pi]);
+      if (!isFinite(px[pi]) || !isFinite(py[pi])) continue;
+      var key = gridKey(Math.floor(px[pi] / PROXIMITY_RADIUS), Math.floor(py[pi] / PROXIMITY_RADIUS));
+      var cell = grid.get(key);
+      if (!cell) grid.set(key, cell = []);
+      cell.push(ci, pi);
+    }}
+    cache[ci] = {{px: px, py: py}};
+  }}
+  return {{traces: cache, grid: grid}};
+}}
 
 function setupProximityHover() {{
   var plotDiv = document.querySelector('.plotly-graph-div');
   if (!plotDiv) return;
 
+  var invalidate = function() {{ PIXEL_CACHE = null; }};
+  plotDiv.on('plotly_relayout', invalidate);
+  plotDiv.on('plotly_afterplot', invalidate);
+
   plotDiv.on('plotly_hover', function(data) {{
     if (isProximityHover) return;
-    var xaxis = plotDiv._fullLayout.xaxis;
-    var yaxis = plotDiv._fullLayout.yaxis;
+    if (!PIXEL_CACHE) PIXEL_CACHE = buildPixelCache(plotDiv);
     var hoverPt = data.points[0];
-    var hx = xaxis.d2p(hoverPt.x);
-    var hy = yaxis.d2p(hoverPt.y);
-    var threshold = 50;
+    var hx = plotDiv._fullLayout.xaxis.d2p(hoverPt.x);
+    var hy = plotDiv._fullLayout.yaxis.d2p(hoverPt.y);
+    var r2 = PROXIMITY_RADIUS * PROXIMITY_RADIUS;
 
+    // ホバー点のセルと周囲8セルの点だけを距離判定する（セル幅 = 半径なので取りこぼしはない）
     var nearbyPoints = [];
-    plotDiv.data.forEach(function(trace, ci) {{
-      if (!trace.visible || trace.visible === false) return;
-      if (!trace.x || !trace.hovertext) return;
-      trace.x.forEach(function(x, pi) {{
-        if (x == null) return;
-        var px = xaxis.d2p(x);
-        var py = yaxis.d2p(trace.y[pi]);
-        var dist = Math.sqrt(Math.pow(px - hx, 2) + Math.pow(py - hy, 2));
-        if (dist <= threshold) {{
-          nearbyPoints.push({{curveNumber: ci, pointNumber: pi}});
+    var hcx = Math.floor(hx / PROXIMITY_RADIUS);
+    var hcy = Math.floor(hy / PROXIMITY_RADIUS);
+    for (var cx = hcx - 1; cx <= hcx + 1; cx++) {{
+      for (var cy = hcy - 1; cy <= hcy + 1; cy++) {{
+        var cell = PIXEL_CACHE.grid.get(gridKey(cx, cy));
+        if (!cell) continue;
+        for (var k = 0; k < cell.length; k += 2) {{
+          var ci = cell[k], pi = cell[k + 1];
+          var dx = PIXEL_CACHE.traces[ci].px[pi] - hx;
+          var dy = PIXEL_CACHE.traces[ci].py[pi] - hy;
+          if (dx * dx + dy * dy <= r2) {{
+            nearbyPoints.push({{curveNumber: ci, pointNumber: pi}});
+          }}
         }}
-      }});
-    }});
+      }}
+    }}
+    // 全点走査のときと同じ（トレース順・点順）並びにそろえる
+    nearbyPoints.sort(function(a, b) {{ return a.curveNumber - b.curveNumber || a.pointNumber - b.pointNumber; }});
 
     if (nearbyPoints.length > 1) {{
       isProximityHover = true;
@@ -1659,30 +2028,43 @@ function setupProximityHover() {{
   }});
 }}
 
-// ビュー切替時にフィルタ再適用
-function setupViewChangeListener() {{
-  var plotDiv = document.querySelector('.plotly-graph-div');
-  if (!plotDiv) return;
-  plotDiv.on('plotly_buttonclicked', function() {{
-    setTimeout(function() {{ applyFilters(); }}, 100);
-  }});
+// 入力中の連続イベントはまとめて1回だけフィルタを適用
+var FILTER_DEBOUNCE_MS = 150;
+
+function debounce(fn, ms) {{
+  var t;
+  return function() {{
+    var args = arguments, ctx = this;
+    clearTimeout(t);
+    t = setTimeout(function() {{ fn.apply(ctx, args); }}, ms);
+  }};
+}}
+
+var applyFiltersDebounced = debounce(applyFilters, FILTER_DEBOUNCE_MS);
+
+function setupFilterInputs() {{
+  for (var key in INPUTS) {{
+    INPUTS[key].addEventListener('input', applyFiltersDebounced);
+    INPUTS[key].addEventListener('change', applyFiltersDebounced);
+  }}
 }}
 
 // 初期化
 window.addEventListener('load', function() {{
-  setTimeout(function() {{
+  setupProximityHover();
+  dataReady.then(function(ok) {{
+    if (!ok) return;
     buildStudioList();
-    initOriginalData();
-    setupProximityHover();
-    setupViewChangeListener();
-  }}, 500);
+    setupFilterInputs();
+  }});
 }});
 </script>
 </body>
 </html>"""
 
-with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-    f.write(full_html)
+# UTF-8 への変換は書き出し時の1回だけ
+with open(OUTPUT_PATH, "wb") as f:
+    f.write(full_html.encode("utf-8"))
 
 print(f"HTML出力完了: {OUTPUT_PATH}")
 print(f"トレース数: {total_traces}")